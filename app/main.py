@@ -1,8 +1,55 @@
+import threading
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import auth, items, notifications, profile, resolutions
+from app.db.db import engine
+from app.routers import admin, auth, files, images, items, metrics, notifications, profile, resolutions, searches
+from app.utils import image_pool
+from app.utils.admission import AdmissionMiddleware
+from app.utils.profiler import ProfilerMiddleware
+from app.utils.request_context import RequestContextMiddleware
+from app.utils.delete_queue import delete_worker
+from app.utils.hash_index import image_index
+from app.utils.image_spool import spool_uploader
+from app.utils.image_tasks import requeue_staged_images
+from app.utils.matching import match_index
+from app.utils import metrics as app_metrics, tracing
+from app.utils.search_index import search_index
+from app.utils.slow_queries import slow_query_log
+from app.utils.storage import STORAGE_BACKEND
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # background workers
+    spool_uploader.start()
+    delete_worker.start()
+    tracing.trace_exporter.start()
+    slow_query_log.start()
+
+    # warm the in-memory indexes without holding up startup
+    threading.Thread(target=image_index.sync, name="hash-index-sync", daemon=True).start()
+    threading.Thread(target=match_index.sync, name="match-index-sync", daemon=True).start()
+    threading.Thread(target=search_index.sync, name="search-index-sync", daemon=True).start()
+
+    # finalized uploads whose processing was lost in a restart
+    started_at = datetime.now(timezone.utc)
+    threading.Thread(target=requeue_staged_images, args=(started_at,), name="staged-image-recovery", daemon=True).start()
+
+    yield
+
+    delete_worker.stop()
+    spool_uploader.stop()
+    image_pool.shutdown()
+    tracing.trace_exporter.stop()
+    slow_query_log.stop()
+
+
+app = FastAPI(lifespan=lifespan)
+
+# Load shedding for CPU-heavy routes; added first so CORS headers still wrap a 503
+app.add_middleware(AdmissionMiddleware)
 
 # CORS
 app.add_middleware(
@@ -11,14 +58,35 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # readable by the cross-origin web client
+    expose_headers=["X-Possible-Duplicates", "Retry-After", "X-Trace-Id"],
 )
 
+# route of the current request, for the slow-query log
+app.add_middleware(RequestContextMiddleware)
+app.add_middleware(ProfilerMiddleware)
+app.add_middleware(tracing.TracingMiddleware)
+
+# Outermost, so shed and CORS-rejected requests are counted too
+app.add_middleware(app_metrics.MetricsMiddleware)
+app_metrics.instrument_engine(engine)
+tracing.instrument_engine(engine)
+slow_query_log.instrument(engine)
+
 # Register routers
 app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
 app.include_router(profile.router, prefix="/profile", tags=["Profile"])
 app.include_router(items.router, prefix="/items", tags=["Items"])
 app.include_router(notifications.router, prefix="/notifications", tags=["Notifications"])
 app.include_router(resolutions.router, prefix="/resolutions", tags=["Resolutions"])
+app.include_router(images.router, prefix="/images", tags=["Images"])
+app.include_router(searches.router, prefix="/searches", tags=["Saved Searches"])
+app.include_router(admin.router, prefix="/admin", tags=["Admin"])
+app.include_router(metrics.router, tags=["Metrics"])
+
+# files are only served by the API when using local storage
+if STORAGE_BACKEND == "local":
+    app.include_router(files.router, prefix="/files", tags=["Files"])
 
 
 @app.get("/")
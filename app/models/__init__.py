@@ -2,4 +2,8 @@ from .user import User
 from .item import Item
 from .notification import Notification
 from .resolution import Resolution
-from .report import Report
\ No newline at end of file
+from .report import Report
+from .pending_delete import PendingDelete
+from .saved_search import SavedSearch
+from .item_tombstone import ItemTombstone
+from .rate_limit_bucket import RateLimitBucket
\ No newline at end of file
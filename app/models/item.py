@@ -1,14 +1,27 @@
 from typing import Optional
 import uuid
+from sqlalchemy import BigInteger, Index, func, text
 from sqlmodel import Field, SQLModel
 from datetime import datetime, timezone
 
+# timestamps are naive UTC; clock_timestamp(), unlike now(), is the time of
+# the statement rather than the start of the transaction
+UTC_NOW = func.timezone("UTC", func.clock_timestamp())
+
 
 class Item(SQLModel, table=True):
     __tablename__ = "items"
 
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    # drives /items/changes. Stamped by the database as the row is written (not
+    # when the object is built), so it can't land behind a cursor handed out
+    # while the request was still busy; None until the INSERT returns it
+    updated_at: Optional[datetime] = Field(
+        default=None,
+        index=True,
+        sa_column_kwargs={"server_default": UTC_NOW, "onupdate": UTC_NOW, "nullable": False},
+    )
 
     # Reporter info
     user_id: int = Field(foreign_key="users.id")
@@ -20,9 +33,34 @@ class Item(SQLModel, table=True):
     location: str
     type: str  # "lost" or "found"
     date: datetime
-    image: str
+    image: str = Field(index=True)  # resize proxy checks the item is still visible
+    image_status: str = Field(default="ready")  # "pending" while the image is spooled locally, "ready" once it is in the bucket, "failed" if the spooled copy was lost
+    image_width: Optional[int] = Field(default=None)
+    image_height: Optional[int] = Field(default=None)
+    image_blurhash: Optional[str] = Field(default=None)  # placeholder shown until the image loads
+    image_hash: Optional[int] = Field(default=None, sa_type=BigInteger)  # 64-bit dHash (signed), for duplicate/similar photo lookup
     visibility: str = Field(default="public")  # public/boys/girls
 
     # Moderation
     is_hidden: bool = Field(default=False)
+    report_count: int = Field(default=0)  # reports since the last moderator dismissal, bumped atomically by /items/{id}/report
     hidden_reason: Optional[str] = Field(default=None) # Allowed fields: "auto_report_threshold", "admin_moderation"
+
+
+# profile listings: one user's lost/found items, newest first, keyset on (created_at, id)
+Index(
+    "ix_items_user_id_type_created_at",
+    Item.user_id,
+    Item.type,
+    Item.created_at.desc(),
+    Item.id.desc(),
+)
+
+# finalize claims a staged upload by inserting the item that points at it, so
+# one upload can't back two items
+Index(
+    "ix_items_image_staged",
+    Item.image,
+    unique=True,
+    postgresql_where=text("image LIKE 'staging/%'"),
+)
@@ -0,0 +1,20 @@
+from typing import Optional
+import uuid
+from sqlmodel import Field, SQLModel
+from datetime import datetime, timezone
+
+
+class ItemTombstone(SQLModel, table=True):
+    __tablename__ = "item_tombstones"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+
+    # No foreign key, the item row is usually gone
+    item_id: uuid.UUID = Field(index=True)
+    deleted_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), index=True)
+
+    reason: str  # "deleted", "hidden", "restricted" (visibility narrowed)
+
+    # the item's visibility before the change; only users who could see it
+    # then are told to drop it
+    visibility: str = Field(default="public")
@@ -1,5 +1,6 @@
 from typing import Optional
 import uuid
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel
 from datetime import datetime, timezone
 
@@ -13,21 +14,33 @@ class Notification(SQLModel, table=True):
     user_id: int = Field(foreign_key="users.id")
 
     # Notification fields
-    type: str = Field(index=True) # only for icon selection (Doesn't depict current status of resolution), values: "claim_created", "claim_approved", "claim_rejected", "system_notice", "ban_warning"
+    type: str = Field(index=True) # only for icon selection (Doesn't depict current status of resolution), values: "claim_created", "claim_approved", "claim_rejected", "system_notice", "ban_warning", "match_found", "saved_search_match"
 
     title: str
     message: str
     
+    # kept (unlinked) when the item is deleted
     item_id: Optional[uuid.UUID] = Field(
         default=None,
         foreign_key="items.id",
+        ondelete="SET NULL",
         index=True
     )
     
+    # kept (unlinked) when the claim goes with its item
     resolution_id: Optional[uuid.UUID] = Field(
         default=None,
         foreign_key="resolutions.id",
+        ondelete="SET NULL",
         index=True
     )
     
-    is_read: bool = Field(default=False)
\ No newline at end of file
+    is_read: bool = Field(default=False)
+
+
+# a user's notifications newest first, and their unread count
+Index(
+    "ix_notifications_user_id_created_at",
+    Notification.user_id,
+    Notification.created_at.desc(),
+)
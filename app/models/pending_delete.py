@@ -0,0 +1,18 @@
+from typing import Optional
+from sqlmodel import Field, SQLModel
+from datetime import datetime, timezone
+
+
+class PendingDelete(SQLModel, table=True):
+    __tablename__ = "pending_deletes"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    # Bucket object to remove
+    key: str
+
+    # Retry state, drained by the delete queue worker
+    attempts: int = Field(default=0)
+    next_attempt_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), index=True)
+    last_error: Optional[str] = Field(default=None)
@@ -0,0 +1,12 @@
+from sqlmodel import Field, SQLModel
+
+
+class RateLimitBucket(SQLModel, table=True):
+    __tablename__ = "rate_limit_buckets"
+
+    # "<policy>:user:<sub>" or "<policy>:ip:<address>"
+    key: str = Field(primary_key=True)
+
+    # Token bucket state, written by the postgres rate limit backend
+    tokens: float
+    updated_at: float = Field(index=True)  # unix time of the last refill
@@ -1,5 +1,6 @@
 from typing import Optional
 import uuid
+from sqlalchemy import Index, text
 from sqlmodel import Field, SQLModel, UniqueConstraint
 from datetime import datetime, timezone
 
@@ -13,7 +14,7 @@ class Report(SQLModel, table=True):
     # Reporter info
     user_id: int = Field(foreign_key="users.id")
 
-    item_id: uuid.UUID = Field(foreign_key="items.id", index=True)
+    item_id: uuid.UUID = Field(foreign_key="items.id", ondelete="CASCADE", index=True)  # reports go with the item
 
     # Report fields
     reason: str
@@ -31,4 +32,10 @@ class Report(SQLModel, table=True):
             "item_id",
             name="uq_user_item_report"    
         ),
+        # moderation queue groups pending reports by item
+        Index(
+            "ix_reports_pending_item_id",
+            "item_id",
+            postgresql_where=text("status = 'pending'"),
+        ),
     )
@@ -0,0 +1,22 @@
+from typing import Optional
+import uuid
+from sqlmodel import Field, SQLModel
+from datetime import datetime, timezone
+
+
+class SavedSearch(SQLModel, table=True):
+    __tablename__ = "saved_searches"
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    # Subscriber
+    user_id: int = Field(foreign_key="users.id", index=True)
+
+    # Predicates, None matches anything
+    category: Optional[str] = Field(default=None)
+    type: Optional[str] = Field(default=None)  # "lost" or "found"
+    visibility: Optional[str] = Field(default=None)  # public/boys/girls
+    location: Optional[str] = Field(default=None)  # every word must appear in the item's location
+
+    is_active: bool = Field(default=True)
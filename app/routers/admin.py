@@ -0,0 +1,285 @@
+from datetime import datetime, timezone
+from typing import Literal, Optional
+import uuid
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field
+from sqlalchemy import delete, tuple_, update
+from sqlmodel import Session, func, select
+
+from app.db.db import get_session
+from app.models.item import Item
+from app.models.item_tombstone import ItemTombstone
+from app.models.notification import Notification
+from app.models.report import Report
+from app.models.resolution import Resolution
+from app.utils.admission import admission_stats
+from app.utils.auth_helper import get_current_user_required, require_admin
+from app.utils.bulk_import import import_archive
+from app.utils.image_cache import evict_image
+from app.utils.matching import match_index
+from app.utils.pagination import decode_rank_cursor, encode_rank_cursor
+from app.utils.s3_service import get_all_urls
+from app.utils.slow_queries import slow_query_log
+from app.utils.streaming import csv_response, iter_csv, iter_ndjson, ndjson_response
+
+
+router = APIRouter()
+
+# rows fetched per round trip from the server-side cursor; with streaming this
+# is what bounds memory, not the size of the export
+EXPORT_BATCH_SIZE = 1000
+
+MAX_IMPORT_SIZE_MB = 500
+
+MODERATION_PAGE_LIMIT = 50
+MODERATION_MAX_PAGE_LIMIT = 200
+MAX_REVIEW_BATCH = 200
+
+EXPORT_TABLES = {
+    "items": Item,
+    "reports": Report,
+    "resolutions": Resolution,
+}
+
+
+@router.get("/export/{table}")
+async def export_table(
+    table: Literal["items", "reports", "resolutions"],
+    format: Literal["csv", "ndjson"] = "csv",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    status: Optional[str] = None,
+    is_hidden: Optional[bool] = None,
+    session: Session = Depends(get_session),
+    current_user=Depends(get_current_user_required),
+):
+    """
+    Stream a full table export, filtered by created_at range, status
+    (reports/resolutions) or is_hidden (items).
+    """
+    require_admin(session, current_user)
+
+    model = EXPORT_TABLES[table]
+
+    query = select(*model.__table__.columns).order_by(model.created_at)
+
+    if start:
+        query = query.where(model.created_at >= start)
+
+    if end:
+        query = query.where(model.created_at < end)
+
+    if status is not None:
+        if model is Item:
+            raise HTTPException(status_code=400, detail="status filter is not supported for items")
+
+        query = query.where(model.status == status)
+
+    if is_hidden is not None:
+        if model is not Item:
+            raise HTTPException(status_code=400, detail="is_hidden filter is only supported for items")
+
+        query = query.where(Item.is_hidden == is_hidden)
+
+    if format == "ndjson":
+        return ndjson_response(iter_ndjson(query, batch_size=EXPORT_BATCH_SIZE))
+
+    return csv_response(iter_csv(query, batch_size=EXPORT_BATCH_SIZE), f"{table}.csv")
+
+
+@router.get("/admission")
+async def get_admission_stats(
+    session: Session = Depends(get_session),
+    current_user=Depends(get_current_user_required),
+):
+    """
+    Concurrency, queue depth and shed counts per admission-controlled route group.
+    """
+    require_admin(session, current_user)
+
+    return admission_stats()
+
+
+@router.get("/slow-queries")
+async def get_slow_queries(
+    limit: int = Query(50, ge=1, le=200),
+    session: Session = Depends(get_session),
+    current_user=Depends(get_current_user_required),
+):
+    """
+    Most recent slow statements with the route that issued them, and the
+    EXPLAIN (ANALYZE, BUFFERS) plan where one was captured.
+    """
+    require_admin(session, current_user)
+
+    return list(slow_query_log.entries)[-limit:][::-1]
+
+
+@router.post("/import")
+async def import_items(
+    archive: UploadFile = File(...),
+    session: Session = Depends(get_session),
+    current_user=Depends(get_current_user_required),
+):
+    """
+    Bulk import a zip of items.csv + photos, posted as the calling admin.
+    Returns the number imported and a per-row error report.
+    """
+    user = require_admin(session, current_user)
+
+    if archive.size and archive.size > MAX_IMPORT_SIZE_MB * 1024 * 1024:
+        raise HTTPException(status_code=400, detail=f"Archive exceeds {MAX_IMPORT_SIZE_MB}MB limit")
+
+    try:
+        report = await run_in_threadpool(import_archive, archive.file, user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        "imported": report.imported,
+        "errors": report.errors,
+    }
+
+
+@router.get("/moderation/queue")
+async def get_moderation_queue(
+    limit: int = Query(MODERATION_PAGE_LIMIT, ge=1, le=MODERATION_MAX_PAGE_LIMIT),
+    cursor: Optional[str] = None,
+    session: Session = Depends(get_session),
+    current_user=Depends(get_current_user_required),
+):
+    """
+    Items with pending reports, most reported first. Counts come from one
+    GROUP BY over the pending-reports partial index; pages are keyset on
+    (pending_reports, item_id) so deep pages cost the same as the first.
+    """
+    require_admin(session, current_user)
+
+    pending = (
+        select(
+            Report.item_id,
+            func.count().label("pending_reports"),
+            func.max(Report.created_at).label("last_reported_at"),
+        )
+        .where(Report.status == "pending")
+        .group_by(Report.item_id)
+        .subquery()
+    )
+
+    query = (
+        select(Item, pending.c.pending_reports, pending.c.last_reported_at)
+        .join(pending, pending.c.item_id == Item.id)
+        .order_by(pending.c.pending_reports.desc(), pending.c.item_id.desc())
+        .limit(limit + 1)
+    )
+
+    if cursor:
+        rank, item_id = decode_rank_cursor(cursor)
+        query = query.where(tuple_(pending.c.pending_reports, pending.c.item_id) < tuple_(rank, item_id))
+
+    rows = session.exec(query).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    items = get_all_urls([item for item, _, _ in rows])
+
+    for data, (_, pending_reports, last_reported_at) in zip(items, rows):
+        data["pending_reports"] = pending_reports
+        data["last_reported_at"] = last_reported_at
+
+    return {
+        "items": items,
+        "cursor": encode_rank_cursor(rows[-1][1], rows[-1][0].id) if has_more else None,
+    }
+
+
+class ReviewPayload(BaseModel):
+    item_ids: list[uuid.UUID] = Field(min_length=1, max_length=MAX_REVIEW_BATCH)
+    action: Literal["hide", "dismiss"]
+
+
+@router.post("/moderation/review")
+async def review_reports(
+    payload: ReviewPayload,
+    session: Session = Depends(get_session),
+    current_user=Depends(get_current_user_required),
+):
+    """
+    Resolve the pending reports on many items at once, in one transaction.
+    hide: reports are marked reviewed and the items hidden.
+    dismiss: reports are dismissed, the items un-hidden and their report
+    count reset so auto-hide starts over.
+    """
+    user = require_admin(session, current_user)
+
+    item_ids = list(set(payload.item_ids))
+    now = datetime.now(timezone.utc)
+
+    reports_updated = session.exec(
+        update(Report)
+        .where(Report.item_id.in_(item_ids))
+        .where(Report.status == "pending")
+        .values(
+            status="reviewed" if payload.action == "hide" else "dismissed",
+            reviewed_by=user.id,
+            reviewed_at=now,
+        )
+    ).rowcount
+
+    if payload.action == "hide":
+        hidden = session.exec(
+            update(Item)
+            .where(Item.id.in_(item_ids))
+            .where(Item.is_hidden == False)
+            .values(is_hidden=True, hidden_reason="admin_moderation")
+            .returning(Item.id, Item.user_id, Item.title, Item.image, Item.visibility)
+        ).all()
+
+        for item_id, owner_id, title, _, visibility in hidden:
+            session.add(Notification(
+                user_id=owner_id,
+                type="system_notice",
+                title="Your item has been hidden",
+                message=f"Your item '{title}' has been hidden by a moderator.",
+                item_id=item_id,
+            ))
+            session.add(ItemTombstone(item_id=item_id, reason="hidden", visibility=visibility))
+
+        session.commit()
+
+        for item_id, _, _, image, _ in hidden:
+            match_index.remove(item_id)
+            evict_image(image)
+
+        items_updated = len(hidden)
+    else:
+        restored = session.exec(
+            update(Item)
+            .where(Item.id.in_(item_ids))
+            .where((Item.is_hidden == True) | (Item.report_count != 0))
+            .values(is_hidden=False, hidden_reason=None, report_count=0)
+            .returning(Item.id)
+        ).all()
+
+        # the hide tombstones would otherwise keep removing them in /items/changes
+        if restored:
+            session.exec(
+                delete(ItemTombstone)
+                .where(ItemTombstone.item_id.in_([item_id for item_id, in restored]))
+                .where(ItemTombstone.reason == "hidden")
+            )
+
+        session.commit()
+
+        # back into the matcher; the feed picks them up through updated_at
+        if restored:
+            for item in session.exec(select(Item).where(Item.id.in_([item_id for item_id, in restored]))):
+                match_index.add(item)
+
+        items_updated = len(restored)
+
+    return {
+        "reports_updated": reports_updated,
+        "items_updated": items_updated,
+    }
@@ -9,6 +9,8 @@ from google.auth.transport import requests as grequests
 
 from app.db.db import get_session
 from app.models.user import User
+from app.utils.rate_limit import rate_limit
+from app.utils.tracing import span
 
 router = APIRouter()
 
@@ -34,10 +36,11 @@ class RefreshTokenRequest(BaseModel):
     token: str
 
 
-@router.post("/google", response_model=TokenResponse)
+@router.post("/google", response_model=TokenResponse, dependencies=[Depends(rate_limit("auth_google"))])
 def google_auth(payload: GoogleIDToken, session: Session = Depends(get_session)):
     try:
-        idinfo = id_token.verify_oauth2_token(payload.id_token, grequests.Request(), CLIENT_ID)
+        with span("google.verify_token"):
+            idinfo = id_token.verify_oauth2_token(payload.id_token, grequests.Request(), CLIENT_ID)
     except ValueError:
         raise HTTPException(status_code=401, detail="Invalid Google ID token")
 
@@ -0,0 +1,67 @@
+import io
+import time
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import FileResponse
+
+from app.utils.storage import LocalStorage, get_storage, verify_signature
+
+
+router = APIRouter()
+
+
+def get_local_storage() -> LocalStorage:
+    storage = get_storage()
+
+    if not isinstance(storage, LocalStorage):
+        raise HTTPException(status_code=404, detail="Not found")
+
+    return storage
+
+
+@router.put("/{key:path}")
+async def upload_file(key: str, max_bytes: int, expires: int, sig: str, request: Request):
+    """
+    Local stand-in for an S3 presigned PUT. The body is the raw file.
+    """
+    storage = get_local_storage()
+    content_type = request.headers.get("content-type", "")
+
+    # a different Content-Type fails the signature, as on S3
+    if not verify_signature(f"PUT\n{key}\n{content_type}\n{max_bytes}\n{expires}", sig, expires):
+        raise HTTPException(status_code=403, detail="Invalid or expired upload URL")
+
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+
+        if len(body) > max_bytes:
+            raise HTTPException(status_code=400, detail="File size outside the allowed range")
+
+    if not body:
+        raise HTTPException(status_code=400, detail="File size outside the allowed range")
+
+    storage.put(key, io.BytesIO(body), content_type)
+
+    return {"ok": True}
+
+
+@router.get("/{key:path}")
+async def get_file(key: str, expires: int, sig: str):
+    """
+    Serve a stored file. FileResponse handles Range requests and uses the
+    server's zero-copy path where available.
+    """
+    storage = get_local_storage()
+
+    if not verify_signature(f"GET\n{key}\n{expires}", sig, expires):
+        raise HTTPException(status_code=403, detail="Invalid or expired URL")
+
+    head = storage.head(key)
+    if not head:
+        raise HTTPException(status_code=404, detail="File not found")
+
+    return FileResponse(
+        storage.path(key),
+        media_type=head["content_type"],
+        headers={"Cache-Control": f"private, max-age={max(expires - int(time.time()), 0)}"},
+    )
@@ -0,0 +1,117 @@
+import asyncio
+import time
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
+from sqlmodel import Session, select
+
+from app.db.db import get_session
+from app.models.item import Item
+from app.utils import image_pool
+from app.utils.image_cache import cache, snap_width, source_name, variant_name
+from app.utils.s3_service import VARIANT_FORMATS, download_s3_object, render_variant, verify_proxy_signature
+
+
+router = APIRouter()
+
+# cache name -> future, so concurrent misses share one fetch + render
+_in_flight: dict[str, asyncio.Future] = {}
+
+
+def fetch_and_render(key: str, width: int, fmt: str) -> bytes:
+    # the source is cached too, other widths of the same key skip the fetch
+    src_name = source_name(key)
+    src_path = cache.get(src_name)
+
+    if src_path:
+        with open(src_path, "rb") as f:
+            data = f.read()
+    else:
+        data = download_s3_object(key)
+        cache.put(src_name, data)
+
+    variant, _ = render_variant(data, width, fmt)
+    return variant
+
+
+def is_live(session: Session, key: str) -> bool:
+    return session.exec(
+        select(Item.id)
+        .where(Item.image == key)
+        .where(Item.is_hidden == False)
+    ).first() is not None
+
+
+async def get_variant_path(session: Session, key: str, width: int, fmt: str) -> Optional[str]:
+    """
+    None if the image no longer belongs to a visible item.
+    """
+    name = variant_name(key, width, fmt)
+
+    path = cache.get(name)
+    if path:
+        return path
+
+    if name in _in_flight:
+        return await asyncio.shield(_in_flight[name])
+
+    # signed URLs outlive a hide or delete; those evict the cache, so checking
+    # on a miss keeps the image from being fetched and cached again
+    if not is_live(session, key):
+        return None
+
+    future = asyncio.get_running_loop().create_future()
+    _in_flight[name] = future
+
+    try:
+        data = await image_pool.run(fetch_and_render, key, width, fmt)
+        path = cache.put(name, data)
+        future.set_result(path)
+        return path
+    except Exception as e:
+        future.set_exception(e)
+        future.exception()  # mark retrieved when nobody else is waiting
+        raise
+    finally:
+        del _in_flight[name]
+
+
+@router.get("/{key:path}")
+async def get_image(
+    key: str,
+    sig: str,
+    expires: int,
+    scope: Literal["public", "private"] = "public",
+    w: int = 768,
+    format: Literal["webp", "jpeg", "png"] = "webp",
+    session: Session = Depends(get_session),
+):
+    """
+    Resize proxy. Variants are rendered once on the image pool and then served
+    from the local disk cache.
+    """
+    if not verify_proxy_signature(key, expires, scope, sig):
+        raise HTTPException(status_code=403, detail="Invalid or expired signature")
+
+    if w < 1:
+        raise HTTPException(status_code=400, detail="Invalid width")
+
+    width = snap_width(w)
+
+    try:
+        path = await get_variant_path(session, key, width, format)
+    except Exception as e:
+        print(f"Error rendering image {key} at {width}px: {e}")
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    if path is None:
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    # no longer than the URL is valid; hostel-only images stay out of shared caches
+    max_age = max(0, expires - int(time.time()))
+
+    return FileResponse(
+        path,
+        media_type=VARIANT_FORMATS[format][1],
+        headers={"Cache-Control": f"{scope}, max-age={max_age}"},
+    )
@@ -1,9 +1,12 @@
 from typing import Literal, Optional
+import os
 import uuid
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Response, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field, field_validator
-from sqlmodel import Session, func, select
-from datetime import datetime
+from sqlmodel import Session, select
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import case, tuple_, update
 from sqlalchemy.exc import IntegrityError
 
 from app.db.db import get_session
@@ -11,9 +14,31 @@ from app.models.item import Item
 from app.models.resolution import Resolution
 from app.models.user import User
 from app.utils.auth_helper import get_current_user_optional, get_current_user_required, get_db_user, get_user_hostel
-from app.utils.s3_service import compress_image, delete_s3_object, generate_signed_url, get_all_urls, upload_to_s3
+from app.utils.s3_service import (
+    STAGING_FOLDER,
+    build_s3_key,
+    compress_image,
+    delete_s3_object,
+    generate_presigned_upload,
+    generate_proxy_path,
+    generate_signed_url,
+    get_all_urls,
+    head_s3_object,
+)
+from app.utils import image_pool
+from app.utils.delete_queue import TOMBSTONE_RETENTION, delete_worker, enqueue_delete
+from app.utils.hash_index import image_index
+from app.utils.image_cache import evict_image
+from app.utils.image_spool import commit_part, discard_part, write_part
+from app.utils.matching import match_index, notify_matches
+from app.utils.search_index import notify_saved_searches
+from app.utils.rate_limit import rate_limit
+from app.utils.pagination import decode_changes_cursor, encode_changes_cursor
+from app.utils.streaming import iter_item_rows, ndjson_response
+from app.utils.image_tasks import queue_staged_image, staged_queue_full
 from app.models.report import Report
 from app.models.notification import Notification
+from app.models.item_tombstone import ItemTombstone
 from app.utils.form_validator import validate_create_item_form
 
 
@@ -22,9 +47,31 @@ router = APIRouter()
 MAX_UPLOAD_SIZE_MB = 3
 MAX_UPLOAD_BYTES = MAX_UPLOAD_SIZE_MB * 1024 * 1024
 
+# reports needed to auto-hide an item
+REPORT_HIDE_THRESHOLD = int(os.getenv("REPORT_HIDE_THRESHOLD", "5"))
+
+# dHash distances: near-identical re-posts vs. visually similar photos
+DUPLICATE_MAX_DISTANCE = 4
+SIMILAR_MAX_DISTANCE = 10
+SIMILAR_LIMIT = 10
+
+# /items/changes page size, and how long a change must be committed before
+# it is handed out (in-flight transactions may still commit older updated_at)
+CHANGES_LIMIT = 500
+CHANGES_SETTLE = timedelta(seconds=2)
+MAX_UUID = uuid.UUID(int=(1 << 128) - 1)
+
+# content types accepted for direct-to-bucket uploads
+ALLOWED_IMAGE_TYPES = {
+    "image/jpeg": "jpg",
+    "image/png": "png",
+    "image/webp": "webp",
+}
+
 
-@router.post("/create")
+@router.post("/create", dependencies=[Depends(rate_limit("items_create"))])
 async def add_item(
+    response: Response,
     item_type: str = Form(...),
     title: str = Form(...),
     description: str = Form(...),
@@ -46,19 +93,166 @@ async def add_item(
         visibility=visibility,
     )
 
-    # read image into memory and upload
+    # read image into memory
     raw_bytes = await image.read()
 
     if len(raw_bytes) > MAX_UPLOAD_BYTES:
         raise HTTPException(status_code=400, detail=f"Image exceeds {MAX_UPLOAD_SIZE_MB}MB limit")
 
-    buffer, ext = compress_image(raw_bytes)
-    s3_key = upload_to_s3(buffer, ext, image.filename)
+    # user lookup
+    user = get_db_user(session, current_user)
+
+    # compress off the event loop
+    buffer, ext, meta = await image_pool.run(compress_image, raw_bytes)
+
+    # create DB item; the image is spooled locally and flushed to the bucket
+    # in the background, so the key is fixed now and the status is pending
+    db_item = Item(
+        user_id=user.id,
+        title=data.title,
+        description=data.description,
+        category=data.category,
+        date=data.date,
+        location=data.location,
+        type=data.item_type,
+        visibility=data.visibility,
+        image=build_s3_key(ext),
+        image_status="pending",
+        image_width=meta["width"],
+        image_height=meta["height"],
+        image_blurhash=meta["blurhash"],
+        image_hash=meta["phash"],
+    )
+
+    duplicates = find_duplicates(session, user.id, meta["phash"])
+
+    # fsync blocks, keep it off the event loop
+    part_path = await run_in_threadpool(write_part, db_item.id, buffer.getvalue())
+
+    try:
+        session.add(db_item)
+        session.commit()
+    except Exception:
+        discard_part(part_path)
+        raise
+
+    commit_part(part_path)
+
+    image_index.add(db_item.id, meta["phash"])
+    match_index.add(db_item)
+    notify_matches(session, db_item)
+    notify_saved_searches(session, db_item)
+
+    # warn the client about likely re-posts without changing the response body
+    if duplicates:
+        response.headers["X-Possible-Duplicates"] = ",".join(str(item_id) for item_id in duplicates)
+
+    return db_item.id
+
+
+def find_duplicates(session: Session, user_id: int, image_hash: int) -> list[uuid.UUID]:
+    """
+    The user's own visible items whose photo is near-identical to this one.
+    """
+    image_index.ensure_synced()
+
+    matches = [item_id for _, item_id in image_index.search(image_hash, DUPLICATE_MAX_DISTANCE)]
+    if not matches:
+        return []
+
+    return session.exec(
+        select(Item.id)
+        .where(Item.id.in_(matches))
+        .where(Item.user_id == user_id)
+        .where(Item.is_hidden == False)
+    ).all()
+
+
+class UploadUrlRequest(BaseModel):
+    content_type: str
+
+
+@router.post("/upload-url")
+async def get_upload_url(
+    payload: UploadUrlRequest,
+    current_user=Depends(get_current_user_required),
+):
+    """
+    Step 1 of the direct upload flow: hand out a presigned PUT so the client
+    uploads the image straight to the bucket, sending the returned headers.
+    """
+    ext = ALLOWED_IMAGE_TYPES.get(payload.content_type)
+    if not ext:
+        raise HTTPException(status_code=400, detail="Unsupported image type")
+
+    # staged keys are namespaced per user so finalize can check ownership
+    key = f"{STAGING_FOLDER}/{current_user['sub']}/{uuid.uuid4().hex}.{ext}"
+
+    upload = generate_presigned_upload(key, payload.content_type, MAX_UPLOAD_BYTES)
+
+    return {
+        "key": key,
+        "url": upload["url"],
+        "method": upload["method"],
+        "headers": upload["headers"],
+    }
+
+
+@router.post("/finalize", dependencies=[Depends(rate_limit("items_create"))])
+async def finalize_item(
+    item_type: str = Form(...),
+    title: str = Form(...),
+    description: str = Form(...),
+    category: str = Form(...),
+    date: str = Form(...),
+    location: str = Form(...),
+    visibility: str = Form(...),
+    staged_key: str = Form(...),
+    session: Session = Depends(get_session),
+    current_user=Depends(get_current_user_required),
+):
+    """
+    Step 2 of the direct upload flow: create the item once the staged image is
+    in the bucket. Compression runs afterwards on the image pool.
+    """
+    data = validate_create_item_form(
+        item_type=item_type,
+        title=title,
+        description=description,
+        category=category,
+        date=date,
+        location=location,
+        visibility=visibility,
+    )
+
+    if not staged_key.startswith(f"{STAGING_FOLDER}/{current_user['sub']}/"):
+        raise HTTPException(status_code=403, detail="Unauthorized upload key")
+
+    # the upload stays staged, the client can finalize it again later
+    if staged_queue_full():
+        raise HTTPException(
+            status_code=503,
+            detail="Server is busy, try again later",
+            headers={"Retry-After": "10"},
+        )
+
+    # re-check what actually landed in the bucket, don't trust the policy alone
+    head = head_s3_object(staged_key)
+    if not head:
+        raise HTTPException(status_code=400, detail="Uploaded image not found")
+
+    if head["size"] > MAX_UPLOAD_BYTES:
+        delete_s3_object(staged_key)
+        raise HTTPException(status_code=400, detail=f"Image exceeds {MAX_UPLOAD_SIZE_MB}MB limit")
+
+    if head["content_type"] not in ALLOWED_IMAGE_TYPES:
+        delete_s3_object(staged_key)
+        raise HTTPException(status_code=400, detail="Unsupported image type")
 
     # user lookup
     user = get_db_user(session, current_user)
 
-    # create DB item
+    # create DB item, pointing at the staged original until compression is done
     db_item = Item(
         user_id=user.id,
         title=data.title,
@@ -68,18 +262,32 @@ async def add_item(
         location=data.location,
         type=data.item_type,
         visibility=data.visibility,
-        image=s3_key,
+        image=staged_key,
     )
 
     session.add(db_item)
+
+    try:
+        session.flush()
+    except IntegrityError:
+        session.rollback()
+        raise HTTPException(status_code=409, detail="This upload has already been used")
+
     session.commit()
     session.refresh(db_item)
 
+    queue_staged_image(db_item.id, staged_key)
+
+    match_index.add(db_item)
+    notify_matches(session, db_item)
+    notify_saved_searches(session, db_item)
+
     return db_item.id
 
 
 @router.get("/all")
 async def get_all_items(
+    stream: bool = False,
     session: Session = Depends(get_session),
     current_user=Depends(get_current_user_optional),
 ):
@@ -95,6 +303,10 @@ async def get_all_items(
     else:
         query = query.where(Item.visibility == 'public')
 
+    # full listing for export-style consumers, one JSON object per line
+    if stream:
+        return ndjson_response(iter_item_rows(query))
+
     # fetch items
     items = session.exec(query).all()
 
@@ -105,6 +317,99 @@ async def get_all_items(
     }
 
 
+@router.get("/changes")
+async def get_item_changes(
+    since: Optional[str] = None,
+    session: Session = Depends(get_session),
+    current_user=Depends(get_current_user_optional),
+):
+    """
+    Delta sync for the feed. Returns items changed after the cursor (upserts)
+    and ids to drop (deleted, hidden or no longer visible to this user).
+    Without a cursor it pages through the full feed, as of the first page.
+    Keep calling with the returned cursor while has_more is true. A cursor
+    older than the tombstone retention gets a 410, the client has to start
+    over without one.
+    """
+    # timestamps are stored as naive UTC
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+
+    if since:
+        since_ts, since_id, snapshot = decode_changes_cursor(since)
+    else:
+        since_ts, since_id, snapshot = datetime.min, uuid.UUID(int=0), now - CHANGES_SETTLE
+
+    # full sync pages carry the snapshot, their position can be arbitrarily old
+    full_sync = snapshot is not None
+
+    # the following incremental sync reads tombstones from here on; older ones
+    # may be pruned and removals would be missed
+    if (snapshot if full_sync else since_ts) < now - TOMBSTONE_RETENTION:
+        raise HTTPException(status_code=410, detail="Cursor expired, sync again without a cursor")
+
+    hostel = get_user_hostel(session, current_user)
+
+    upper = snapshot if full_sync else now - CHANGES_SETTLE
+
+    query = (
+        select(Item)
+        .where(tuple_(Item.updated_at, Item.id) > tuple_(since_ts, since_id))
+        .where(Item.updated_at <= upper)
+        .order_by(Item.updated_at, Item.id)
+        .limit(CHANGES_LIMIT + 1)
+    )
+
+    # only what this user can see; removals come from tombstones below, so
+    # ids of items they never had don't leak through "removed"
+    query = query.where(Item.is_hidden == False)
+
+    if hostel:
+        query = query.where((Item.visibility == hostel) | (Item.visibility == "public"))
+    else:
+        query = query.where(Item.visibility == "public")
+
+    rows = session.exec(query).all()
+
+    has_more = len(rows) > CHANGES_LIMIT
+    rows = rows[:CHANGES_LIMIT]
+
+    if has_more:
+        cursor = encode_changes_cursor(rows[-1].updated_at, rows[-1].id, snapshot)
+        page_upper = rows[-1].updated_at
+    else:
+        # a finished full sync continues incrementally from its snapshot
+        cursor = encode_changes_cursor(upper, MAX_UUID)
+        page_upper = upper
+
+    removed = set()
+
+    # nothing to remove on the client yet during a full sync
+    if not full_sync:
+        tombstones = (
+            select(ItemTombstone.item_id)
+            .where(ItemTombstone.deleted_at > since_ts)
+            .where(ItemTombstone.deleted_at <= page_upper)
+        )
+
+        if hostel:
+            tombstones = tombstones.where((ItemTombstone.visibility == hostel) | (ItemTombstone.visibility == "public"))
+        else:
+            tombstones = tombstones.where(ItemTombstone.visibility == "public")
+
+        removed.update(session.exec(tombstones).all())
+
+    # an item hidden and restored (or still visible after a visibility
+    # change) within the window is live
+    removed.difference_update(item.id for item in rows)
+
+    return {
+        "items": get_all_urls(rows),
+        "removed": list(removed),
+        "cursor": cursor,
+        "has_more": has_more,
+    }
+
+
 @router.get("/{item_id}")
 async def get_item(
     item_id: str,
@@ -145,6 +450,7 @@ async def get_item(
 
     item_dict = item.model_dump()
     item_dict["image"] = generate_signed_url(item.image)
+    item_dict["image_proxy"] = generate_proxy_path(item.image, item.visibility)
 
     return {
         "item": item_dict,
@@ -156,6 +462,108 @@ async def get_item(
         "claim_status": claim_status,
     }
 
+@router.get("/{item_id}/similar")
+async def get_similar_items(
+    item_id: uuid.UUID,
+    session: Session = Depends(get_session),
+    current_user=Depends(get_current_user_optional),
+):
+    """
+    Items whose photo is perceptually close to this item's photo.
+    """
+    hostel = get_user_hostel(session, current_user)
+
+    item = session.exec(
+        select(Item)
+        .where(Item.id == item_id)
+        .where(Item.is_hidden == False)
+    ).first()
+
+    if not item:
+        raise HTTPException(404, "Item not found")
+
+    if item.visibility != "public" and item.visibility != hostel:
+        raise HTTPException(403, "Unauthorized to view this item")
+
+    if item.image_hash is None:
+        return {"items": []}
+
+    image_index.ensure_synced()
+
+    distances = {
+        match_id: distance
+        for distance, match_id in image_index.search(item.image_hash, SIMILAR_MAX_DISTANCE)
+        if match_id != item.id
+    }
+
+    if not distances:
+        return {"items": []}
+
+    # the index may be stale, the DB has the final say on what is visible
+    query = select(Item).where(Item.id.in_(distances)).where(Item.is_hidden == False)
+
+    if hostel:
+        query = query.where((Item.visibility == hostel) | (Item.visibility == "public"))
+    else:
+        query = query.where(Item.visibility == "public")
+
+    matches = sorted(session.exec(query).all(), key=lambda match: distances[match.id])[:SIMILAR_LIMIT]
+
+    items_response = get_all_urls(matches)
+    for data in items_response:
+        data["distance"] = distances[data["id"]]
+
+    return {"items": items_response}
+
+
+@router.get("/{item_id}/matches")
+async def get_item_matches(
+    item_id: uuid.UUID,
+    session: Session = Depends(get_session),
+    current_user=Depends(get_current_user_optional),
+):
+    """
+    Likely counterparts of a lost (or found) item, best match first.
+    """
+    hostel = get_user_hostel(session, current_user)
+
+    item = session.exec(
+        select(Item)
+        .where(Item.id == item_id)
+        .where(Item.is_hidden == False)
+    ).first()
+
+    if not item:
+        raise HTTPException(404, "Item not found")
+
+    if item.visibility != "public" and item.visibility != hostel:
+        raise HTTPException(403, "Unauthorized to view this item")
+
+    match_index.ensure_synced()
+
+    # not indexed yet if it came from another worker since the last sync
+    match_index.add(item)
+
+    scores = {match_id: score for score, match_id in match_index.matches(item.id)}
+    if not scores:
+        return {"items": []}
+
+    query = select(Item).where(Item.id.in_(scores)).where(Item.is_hidden == False)
+
+    if hostel:
+        query = query.where((Item.visibility == hostel) | (Item.visibility == "public"))
+    else:
+        query = query.where(Item.visibility == "public")
+
+    matches = sorted(session.exec(query).all(), key=lambda match: -scores[match.id])
+
+    items_response = get_all_urls(matches)
+    for data in items_response:
+        data["match_score"] = round(scores[data["id"]], 3)
+
+    return {"items": items_response}
+
+
 class ItemUpdateSchema(BaseModel):
     title: Optional[str] = Field(None, min_length=3, max_length=30)
     location: Optional[str] = Field(None, min_length=3, max_length=30)
@@ -225,6 +633,10 @@ async def update_item(
             detail="No fields provided for update",
         )
 
+    # users outside the new visibility have to drop it from their feed
+    if update_data.get("visibility", item.visibility) not in (item.visibility, "public"):
+        session.add(ItemTombstone(item_id=item.id, reason="restricted", visibility=item.visibility))
+
     for field, value in update_data.items():
         setattr(item, field, value)
 
@@ -232,6 +644,8 @@ async def update_item(
     session.commit()
     session.refresh(item)
 
+    match_index.add(item)
+
     return {"id": item.id}
 
 @router.delete("/{item_id}")
@@ -243,7 +657,7 @@ async def delete_item(
     item = session.exec(
         select(Item)
         .where(Item.id == item_id)
-        .where(Item.is_hidden is False)
+        .where(Item.is_hidden == False)
     ).first()
 
     if not item:
@@ -257,12 +671,32 @@ async def delete_item(
             status_code=403,
             detail="Unauthorized to delete this item",
         )
-    
-    delete_s3_object(item.image)
+
+    # a live claim needs the item; rejected ones and reports go with it
+    claim = session.exec(
+        select(Resolution.id)
+        .where(Resolution.found_item_id == item.id)
+        .where((Resolution.status == "pending") | (Resolution.status == "approved"))
+    ).first()
+
+    if claim:
+        raise HTTPException(
+            status_code=400,
+            detail="Cannot delete item while it has a pending or approved claim",
+        )
+
+    # bucket cleanup happens in the background, committed with the row delete
+    enqueue_delete(session, item.image)
+    session.add(ItemTombstone(item_id=item.id, reason="deleted", visibility=item.visibility))
 
     session.delete(item)
     session.commit()
 
+    delete_worker.notify()
+    image_index.remove(item.id)
+    match_index.remove(item.id)
+    evict_image(item.image)
+
     return {
     "ok": True
 }
@@ -270,7 +704,7 @@ async def delete_item(
 class ReportCreateSchema(BaseModel):
     reason: Literal['spam', 'inappropriate', 'harassment', 'fake', 'other']
 
-@router.post("/{id}/report")
+@router.post("/{id}/report", dependencies=[Depends(rate_limit("items_report"))])
 async def report_item(
     id: uuid.UUID,
     payload: ReportCreateSchema,
@@ -304,25 +738,34 @@ async def report_item(
     session.add(report)
 
     try:
-        session.commit()
-        session.refresh(report)
+        session.flush()
     except IntegrityError:
         session.rollback()
         raise HTTPException(status_code=409, detail="You have already reported this item")
 
     # Moderation Logic
+    # Count and auto-hide in one statement, in the report's transaction. The
+    # row lock serializes concurrent reports, so exactly one crosses the threshold.
+    crosses = Item.report_count + 1 >= REPORT_HIDE_THRESHOLD
 
-    report_count = session.exec(
-        select(func.count(Report.id))
-        .where(Report.item_id == item.id)
+    hidden = session.exec(
+        update(Item)
+        .where(Item.id == item.id)
+        .where(Item.is_hidden == False)
+        .values(
+            report_count=Item.report_count + 1,
+            is_hidden=crosses,
+            hidden_reason=case((crosses, "auto_report_threshold"), else_=Item.hidden_reason),
+        )
+        .returning(Item.is_hidden)
     ).first()
 
-    session.refresh(item) # refresh to get latest state
-
-    if report_count >= 5:
-        item.is_hidden = True
-        item.hidden_reason = "auto_report_threshold"
+    if hidden is None:
+        # hidden by someone else since we loaded it
+        session.rollback()
+        raise HTTPException(status_code=404, detail="Item not found")
 
+    if hidden.is_hidden:
         # Notify owner about hiding
         notification = Notification(
             user_id=item.user_id,
@@ -332,9 +775,14 @@ async def report_item(
             item_id=item.id,
         )
 
-        session.add(item)
         session.add(notification)
-        session.commit()
+        session.add(ItemTombstone(item_id=item.id, reason="hidden", visibility=item.visibility))
+
+    session.commit()
+
+    if hidden.is_hidden:
+        match_index.remove(item.id)
+        evict_image(item.image)
 
         # TODO: Increment warning count for user and ban if necessary
 
@@ -0,0 +1,23 @@
+import hmac
+import os
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+
+from app.utils.metrics import render
+
+
+router = APIRouter()
+
+# when set, scrapers must send "Authorization: Bearer <token>"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics(request: Request):
+    if METRICS_TOKEN:
+        expected = f"Bearer {METRICS_TOKEN}"
+
+        if not hmac.compare_digest(request.headers.get("authorization", ""), expected):
+            raise HTTPException(status_code=401, detail="Invalid metrics token")
+
+    return PlainTextResponse(render(), media_type="text/plain; version=0.0.4")
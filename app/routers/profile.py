@@ -1,18 +1,73 @@
 import re
-from fastapi import APIRouter, HTTPException
+from typing import Literal, Optional
+from fastapi import APIRouter, HTTPException, Query
 from fastapi.params import Depends
 from pydantic import BaseModel
-from sqlmodel import Session, select
+from sqlalchemy import tuple_
+from sqlmodel import Session, func, select
 
 from app.db.db import get_session
 from app.models.item import Item
 from app.models.user import User
 from app.utils.auth_helper import get_current_user_optional, get_current_user_required, get_db_user
+from app.utils.pagination import decode_cursor, encode_cursor
 from app.utils.s3_service import get_all_urls
+from app.utils.streaming import iter_item_rows, ndjson_response
 
 
 router = APIRouter()
 
+PROFILE_PAGE_LIMIT = 20
+PROFILE_MAX_PAGE_LIMIT = 100
+ITEM_TYPES = ("lost", "found")
+
+
+def list_items_by_type(
+    session: Session,
+    filters: list,
+    limit: int,
+    cursors: dict[str, Optional[str]],
+    item_type: Optional[str] = None,
+) -> dict:
+    """
+    One page of lost and one of found items (newest first), each with its own
+    keyset cursor, plus per-type totals from a single GROUP BY. Pass item_type
+    to page through one section only ("load more").
+    Walks ix_items_user_id_type_created_at, so cost is independent of how
+    many items the user has posted.
+    """
+    counts = dict(
+        session.exec(
+            select(Item.type, func.count()).where(*filters).group_by(Item.type)
+        ).all()
+    )
+
+    response = {}
+
+    for section in [item_type] if item_type else ITEM_TYPES:
+        query = (
+            select(Item)
+            .where(*filters)
+            .where(Item.type == section)
+            .order_by(Item.created_at.desc(), Item.id.desc())
+            .limit(limit + 1)
+        )
+
+        if cursors.get(section):
+            created_at, item_id = decode_cursor(cursors[section])
+            query = query.where(tuple_(Item.created_at, Item.id) < tuple_(created_at, item_id))
+
+        items = session.exec(query).all()
+        has_more = len(items) > limit
+        items = items[:limit]
+
+        response[f"{section}_items"] = get_all_urls(items)
+        response[f"{section}_cursor"] = encode_cursor(items[-1].created_at, items[-1].id) if has_more else None
+
+    response["counts"] = {section: counts.get(section, 0) for section in ITEM_TYPES}
+
+    return response
+
 class HostelPayload(BaseModel):
     hostel: str
 
@@ -83,30 +138,43 @@ async def get_my_profile(
 
 @router.get("/items")
 async def get_my_items(
+    stream: bool = False,
+    limit: int = Query(PROFILE_PAGE_LIMIT, ge=1, le=PROFILE_MAX_PAGE_LIMIT),
+    lost_cursor: Optional[str] = None,
+    found_cursor: Optional[str] = None,
+    item_type: Optional[Literal["lost", "found"]] = Query(None, alias="type"),
     session: Session = Depends(get_session),
     current_user=Depends(get_current_user_required),
 ):
     user = get_db_user(session, current_user)
 
-    items = session.exec(
+    query = (
         select(Item)
         .where(Item.user_id == user.id)
         .order_by(Item.created_at.desc())
-    ).all()
+    )
 
-    # Separate by type
-    lost_items = [item for item in items if item.type == "lost"]
-    found_items = [item for item in items if item.type == "found"]
+    # NDJSON, one item per line; clients group on "type"
+    if stream:
+        return ndjson_response(iter_item_rows(query))
 
-    return {
-        "lost_items": get_all_urls(lost_items),
-        "found_items": get_all_urls(found_items),
-    }
+    return list_items_by_type(
+        session,
+        [Item.user_id == user.id],
+        limit,
+        {"lost": lost_cursor, "found": found_cursor},
+        item_type,
+    )
 
 
 @router.get("/{public_id}")
 async def get_profile(
     public_id: str,
+    stream: bool = False,
+    limit: int = Query(PROFILE_PAGE_LIMIT, ge=1, le=PROFILE_MAX_PAGE_LIMIT),
+    lost_cursor: Optional[str] = None,
+    found_cursor: Optional[str] = None,
+    item_type: Optional[Literal["lost", "found"]] = Query(None, alias="type"),
     session: Session = Depends(get_session),
     current_user=Depends(get_current_user_optional),
 ):
@@ -129,18 +197,17 @@ async def get_profile(
         if viewer:
             hostel = viewer.hostel
 
-    # Build item query
-    query = select(Item).where(Item.user_id == profile_user.id)
+    # Build item filters
+    filters = [Item.user_id == profile_user.id]
 
     if hostel:
-        query = query.where((Item.visibility == hostel) | (Item.visibility == "public"))
+        filters.append((Item.visibility == hostel) | (Item.visibility == "public"))
     else:
-        query = query.where(Item.visibility == "public")
-
-    items = session.exec(query).all()
+        filters.append(Item.visibility == "public")
 
-    lost_items = [item for item in items if item.type == "lost"]
-    found_items = [item for item in items if item.type == "found"]
+    # NDJSON items only, the profile header comes from the regular response
+    if stream:
+        return ndjson_response(iter_item_rows(select(Item).where(*filters)))
 
     return {
         "user": {
@@ -149,6 +216,5 @@ async def get_profile(
             "image": profile_user.image,
             "created_at": profile_user.created_at,
         },
-        "lost_items": get_all_urls(lost_items),
-        "found_items": get_all_urls(found_items),
+        **list_items_by_type(session, filters, limit, {"lost": lost_cursor, "found": found_cursor}, item_type),
     }
\ No newline at end of file
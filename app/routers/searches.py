@@ -0,0 +1,114 @@
+import uuid
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, Field, field_validator
+from sqlmodel import Session, func, select
+
+from app.db.db import get_session
+from app.models.saved_search import SavedSearch
+from app.utils.auth_helper import get_current_user_required, get_db_user
+from app.utils.matching import tokenize
+from app.utils.search_index import search_index, subscription_from
+
+
+router = APIRouter()
+
+MAX_SAVED_SEARCHES = 10
+
+
+class SavedSearchCreateSchema(BaseModel):
+    category: Optional[Literal["electronics", "clothing", "bags", "keys-wallets", "documents", "others"]] = None
+    type: Optional[Literal["lost", "found"]] = None
+    visibility: Optional[Literal["public", "boys", "girls"]] = None
+    location: Optional[str] = Field(None, min_length=3, max_length=30)
+
+    @field_validator("location", mode="before")
+    @classmethod
+    def strip_location(cls, v):
+        if v is None:
+            return v
+
+        if not isinstance(v, str):
+            raise ValueError("Must be a string")
+
+        v = v.strip()
+
+        # matched word by word, so a location of only stopwords ("near the")
+        # would match every item
+        if not tokenize(v):
+            raise ValueError("Location must contain at least one searchable word")
+
+        return v
+
+
+@router.post("/create")
+async def create_saved_search(
+    payload: SavedSearchCreateSchema,
+    session: Session = Depends(get_session),
+    current_user=Depends(get_current_user_required),
+):
+    user = get_db_user(session, current_user)
+
+    if not payload.model_dump(exclude_none=True):
+        raise HTTPException(status_code=400, detail="At least one filter is required")
+
+    count = session.exec(
+        select(func.count(SavedSearch.id))
+        .where(SavedSearch.user_id == user.id)
+        .where(SavedSearch.is_active == True)
+    ).first()
+
+    if count >= MAX_SAVED_SEARCHES:
+        raise HTTPException(status_code=400, detail=f"You can have at most {MAX_SAVED_SEARCHES} saved searches")
+
+    search = SavedSearch(user_id=user.id, **payload.model_dump())
+
+    session.add(search)
+    session.commit()
+    session.refresh(search)
+
+    search_index.add(subscription_from(search))
+
+    return {"id": search.id}
+
+
+@router.get("/all")
+async def get_saved_searches(
+    session: Session = Depends(get_session),
+    current_user=Depends(get_current_user_required),
+):
+    user = get_db_user(session, current_user)
+
+    searches = session.exec(
+        select(SavedSearch)
+        .where(SavedSearch.user_id == user.id)
+        .where(SavedSearch.is_active == True)
+        .order_by(SavedSearch.created_at.desc())
+    ).all()
+
+    return {"searches": searches}
+
+
+@router.delete("/{search_id}")
+async def delete_saved_search(
+    search_id: uuid.UUID,
+    session: Session = Depends(get_session),
+    current_user=Depends(get_current_user_required),
+):
+    user = get_db_user(session, current_user)
+
+    search = session.exec(
+        select(SavedSearch)
+        .where(SavedSearch.id == search_id)
+        .where(SavedSearch.user_id == user.id)
+    ).first()
+
+    if not search:
+        raise HTTPException(status_code=404, detail="Saved search not found")
+
+    session.delete(search)
+    session.commit()
+
+    search_index.remove(search_id)
+
+    return {"ok": True}
@@ -0,0 +1,198 @@
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+from starlette.responses import JSONResponse
+
+from app.utils.image_pool import IMAGE_POOL_WORKERS
+from app.utils.metrics import CallbackMetric
+
+# weight of the newest request in the service time average
+SERVICE_TIME_ALPHA = 0.2
+
+
+@dataclass(frozen=True)
+class AdmissionPolicy:
+    limit: int  # requests running at once
+    queue_size: int  # requests allowed to wait for a slot
+    queue_timeout: float  # seconds a request may wait before it is shed
+    routes: tuple[tuple[str, str], ...]  # (method, path)
+
+
+def policy_from_env(name: str, limit: int, queue_size: int, queue_timeout: float, routes) -> AdmissionPolicy:
+    # ADMISSION_<NAME>="<limit>/<queue size>", e.g. "4/16"
+    value = os.getenv(f"ADMISSION_{name.upper()}")
+
+    if value:
+        limit, queue_size = (int(part) for part in value.split("/"))
+
+    return AdmissionPolicy(limit, queue_size, queue_timeout, tuple(routes))
+
+
+POLICIES = {
+    # decode/encode runs on the image pool, more in flight only adds latency
+    "image_upload": policy_from_env(
+        "image_upload",
+        limit=IMAGE_POOL_WORKERS * 2,
+        queue_size=IMAGE_POOL_WORKERS * 8,
+        queue_timeout=10,
+        routes=[("POST", "/items/create")],
+    ),
+    "bulk_import": policy_from_env(
+        "bulk_import",
+        limit=1,
+        queue_size=0,
+        queue_timeout=0,
+        routes=[("POST", "/admin/import")],
+    ),
+}
+
+
+class AdmissionController:
+    """
+    Concurrency limit with a bounded FIFO wait queue. Requests beyond the
+    queue are refused immediately instead of piling up on the event loop.
+    Lives on the event loop, so no locking.
+    """
+
+    def __init__(self, name: str, policy: AdmissionPolicy):
+        self.name = name
+        self.policy = policy
+
+        self.active = 0
+        self._waiters: deque[asyncio.Future] = deque()
+
+        self.admitted = 0
+        self.shed = 0
+        self.timed_out = 0
+        self._service_time = 1.0
+
+    async def acquire(self) -> bool:
+        if self.active < self.policy.limit and not self._waiters:
+            self.active += 1
+            self.admitted += 1
+            return True
+
+        if len(self._waiters) >= self.policy.queue_size:
+            self.shed += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.policy.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done():
+                # handed a slot just as we gave up, pass it on
+                self.release()
+            else:
+                waiter.cancel()
+                self._waiters.remove(waiter)
+
+            if isinstance(e, asyncio.CancelledError):
+                raise
+
+            self.timed_out += 1
+            self.shed += 1
+            return False
+
+        # release() handed its slot straight to us, active is unchanged
+        self.admitted += 1
+        return True
+
+    def release(self, duration: Optional[float] = None):
+        if duration is not None:
+            self._service_time += SERVICE_TIME_ALPHA * (duration - self._service_time)
+
+        while self._waiters:
+            waiter = self._waiters.popleft()
+
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+        self.active -= 1
+
+    def retry_after(self) -> int:
+        # time to drain what is running and queued at the recent pace
+        backlog = self.active + len(self._waiters) + 1
+        return max(1, math.ceil(self._service_time * backlog / self.policy.limit))
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.policy.limit,
+            "queue_size": self.policy.queue_size,
+            "active": self.active,
+            "queued": len(self._waiters),
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "timed_out": self.timed_out,
+            "avg_service_seconds": round(self._service_time, 3),
+        }
+
+
+controllers = {name: AdmissionController(name, policy) for name, policy in POLICIES.items()}
+
+_routes = {
+    route: controller
+    for controller in controllers.values()
+    for route in controller.policy.routes
+}
+
+
+def admission_stats() -> dict:
+    return {name: controller.stats() for name, controller in controllers.items()}
+
+
+def _stat_metric(name: str, type: str, stat: str):
+    CallbackMetric(
+        name,
+        f"Admission control {stat} requests per route group.",
+        type,
+        ("group",),
+        lambda: {(group,): stats[stat] for group, stats in admission_stats().items()},
+    )
+
+
+_stat_metric("admission_active", "gauge", "active")
+_stat_metric("admission_queued", "gauge", "queued")
+_stat_metric("admission_admitted_total", "counter", "admitted")
+_stat_metric("admission_shed_total", "counter", "shed")
+
+
+class AdmissionMiddleware:
+    """
+    Applies the admission controllers before the request body is read, so a
+    shed upload costs almost nothing. Unlisted routes pass straight through.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        controller = _routes.get((scope["method"], scope["path"]))
+
+        if controller is None:
+            return await self.app(scope, receive, send)
+
+        if not await controller.acquire():
+            response = JSONResponse(
+                {"detail": "Server is busy, try again later"},
+                status_code=503,
+                headers={"Retry-After": str(controller.retry_after())},
+            )
+            return await response(scope, receive, send)
+
+        start = time.monotonic()
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            controller.release(time.monotonic() - start)
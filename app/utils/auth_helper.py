@@ -57,4 +57,14 @@ def get_db_user(session: Session, current_user):
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    return user
\ No newline at end of file
+    return user
+
+
+def require_admin(session: Session, current_user):
+    # check the DB, not the token, so revoked admins lose access immediately
+    user = get_db_user(session, current_user)
+
+    if user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+    return user
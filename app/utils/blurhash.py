@@ -0,0 +1,68 @@
+import numpy as np
+from PIL import Image
+
+BASE83 = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~"
+
+# the hash only carries a few low-frequency components, so a tiny
+# thumbnail gives the same result as the full image at a fraction of the cost
+SAMPLE_WIDTH = 32
+
+
+def _encode83(value: int, length: int) -> str:
+    return "".join(BASE83[(value // 83 ** (length - i)) % 83] for i in range(1, length + 1))
+
+
+def _srgb_to_linear(values: np.ndarray) -> np.ndarray:
+    v = values / 255.0
+    return np.where(v <= 0.04045, v / 12.92, ((v + 0.055) / 1.055) ** 2.4)
+
+
+def _linear_to_srgb(value: float) -> int:
+    v = min(max(value, 0.0), 1.0)
+
+    if v <= 0.0031308:
+        return int(v * 12.92 * 255 + 0.5)
+
+    return int((1.055 * v ** (1 / 2.4) - 0.055) * 255 + 0.5)
+
+
+def encode(img: Image.Image, x_components=4, y_components=3) -> str:
+    """
+    Blurhash (https://blurha.sh) of an RGB image, DCT done as NumPy matrix products.
+    """
+    w, h = img.size
+    if w > SAMPLE_WIDTH:
+        img = img.resize((SAMPLE_WIDTH, max(1, round(h * SAMPLE_WIDTH / w))), Image.BILINEAR)
+
+    pixels = _srgb_to_linear(np.asarray(img, dtype=np.float64))  # (h, w, 3)
+    h, w = pixels.shape[:2]
+
+    basis_x = np.cos(np.pi * np.arange(x_components)[:, None] * np.arange(w)[None, :] / w)  # (cx, w)
+    basis_y = np.cos(np.pi * np.arange(y_components)[:, None] * np.arange(h)[None, :] / h)  # (cy, h)
+
+    # factors[j, i] = sum_xy basis_y[j, y] * basis_x[i, x] * pixel[y, x]
+    factors = np.einsum("jy,ix,yxc->jic", basis_y, basis_x, pixels) / (w * h)
+    factors *= 2
+    factors[0, 0] /= 2  # DC normalisation is 1, AC is 2
+
+    factors = factors.reshape(-1, 3)
+    dc, ac = factors[0], factors[1:]
+
+    result = _encode83((x_components - 1) + (y_components - 1) * 9, 1)
+
+    if len(ac):
+        quantised_max = int(min(max(np.abs(ac).max() * 166 - 0.5, 0), 82))
+        max_value = (quantised_max + 1) / 166
+        result += _encode83(quantised_max, 1)
+    else:
+        max_value = 1
+        result += _encode83(0, 1)
+
+    r, g, b = (_linear_to_srgb(c) for c in dc)
+    result += _encode83((r << 16) + (g << 8) + b, 4)
+
+    quant = np.floor(np.clip(np.sign(ac) * np.abs(ac / max_value) ** 0.5 * 9 + 9.5, 0, 18)).astype(int)
+    for qr, qg, qb in quant:
+        result += _encode83(int(qr) * 19 * 19 + int(qg) * 19 + int(qb), 2)
+
+    return result
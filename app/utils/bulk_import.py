@@ -0,0 +1,243 @@
+"""
+Bulk item import from a zip archive: items.csv plus the photos it references.
+
+items.csv columns: type,title,description,category,date,location,visibility,image
+(image is a path inside the archive). Images are compressed in parallel on a
+process pool and uploaded concurrently; rows go in with a single COPY in one
+transaction. Invalid records are skipped and reported.
+
+Usage:
+    python -m app.utils.bulk_import office-export.zip --user <public_id>
+"""
+import argparse
+import csv
+import io
+import json
+import multiprocessing
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlmodel import Session, select
+
+from app.db.db import engine
+from app.models.item import Item
+from app.models.user import User
+from app.utils.delete_queue import enqueue_delete
+from app.utils.form_validator import ValidatedCreateItem
+from app.utils.s3_service import build_s3_key, compress_image
+from app.utils.storage import get_storage
+
+RECORDS_FILE = "items.csv"
+MAX_IMAGE_BYTES = 3 * 1024 * 1024
+
+IMPORT_PROCESS_WORKERS = int(os.getenv("IMPORT_PROCESS_WORKERS", str(os.cpu_count() or 2)))
+IMPORT_UPLOAD_CONCURRENCY = int(os.getenv("IMPORT_UPLOAD_CONCURRENCY", "16"))
+
+# images held in memory at once
+IMPORT_CHUNK_SIZE = 64
+
+# column order for COPY
+# updated_at is left to its server default
+ITEM_COLUMNS = [column.name for column in Item.__table__.columns if column.server_default is None]
+
+
+@dataclass
+class ImportReport:
+    imported: int = 0
+    errors: list[dict] = field(default_factory=list)
+
+    def error(self, row: int, message):
+        self.errors.append({"row": row, "error": message})
+
+
+def _compress(data: bytes):
+    # runs in a worker process, return only picklable values
+    buffer, ext, meta = compress_image(data)
+    return buffer.getvalue(), ext, meta
+
+
+def read_records(archive: zipfile.ZipFile, report: ImportReport) -> list[tuple[int, ValidatedCreateItem, str]]:
+    try:
+        raw = archive.read(RECORDS_FILE).decode("utf-8-sig")
+    except KeyError:
+        raise ValueError(f"Archive has no {RECORDS_FILE}")
+
+    records = []
+
+    # row numbers match the spreadsheet, header is row 1
+    for row_number, row in enumerate(csv.DictReader(io.StringIO(raw)), start=2):
+        try:
+            record = ValidatedCreateItem(
+                item_type=(row.get("type") or "").strip(),
+                title=(row.get("title") or "").strip(),
+                description=(row.get("description") or "").strip(),
+                category=(row.get("category") or "").strip(),
+                date=(row.get("date") or "").strip(),
+                location=(row.get("location") or "").strip(),
+                visibility=(row.get("visibility") or "public").strip(),
+            )
+        except ValidationError as e:
+            report.error(row_number, e.errors(include_url=False, include_context=False))
+            continue
+
+        image_name = (row.get("image") or "").strip()
+        if not image_name:
+            report.error(row_number, "Missing image")
+            continue
+
+        records.append((row_number, record, image_name))
+
+    return records
+
+
+def copy_items(session: Session, rows: list[dict]):
+    """
+    COPY on Postgres, a multi-row INSERT elsewhere. Runs inside the session's transaction.
+    """
+    if session.get_bind().dialect.name != "postgresql":
+        session.exec(insert(Item), params=rows)
+        return
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows([row[column] for column in ITEM_COLUMNS] for row in rows)
+    buffer.seek(0)
+
+    cursor = session.connection().connection.dbapi_connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY items ({', '.join(ITEM_COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+
+def process_chunk(chunk, user_id: int, process_pool, upload_pool, report: ImportReport) -> list[Item]:
+    """
+    Compress a chunk of (row_number, record, image_name, bytes) on the process
+    pool, upload the results concurrently and return the uploaded items.
+    """
+    futures = [process_pool.submit(_compress, data) for *_, data in chunk]
+    processed = []
+
+    for (row_number, record, image_name, _), future in zip(chunk, futures):
+        try:
+            data, ext, meta = future.result()
+        except Exception as e:
+            report.error(row_number, f"Invalid image {image_name}: {e}")
+            continue
+
+        item = Item(
+            user_id=user_id,
+            title=record.title,
+            description=record.description,
+            category=record.category,
+            date=record.date,
+            location=record.location,
+            type=record.item_type,
+            visibility=record.visibility,
+            image=build_s3_key(ext),
+            image_width=meta["width"],
+            image_height=meta["height"],
+            image_blurhash=meta["blurhash"],
+            image_hash=meta["phash"],
+        )
+        processed.append((row_number, item, data))
+
+    storage = get_storage()
+    uploads = [upload_pool.submit(storage.put, item.image, io.BytesIO(data)) for _, item, data in processed]
+    uploaded = []
+
+    for (row_number, item, _), future in zip(processed, uploads):
+        try:
+            future.result()
+            uploaded.append(item)
+        except Exception as e:
+            report.error(row_number, f"Upload failed: {e}")
+
+    return uploaded
+
+
+def import_archive(fileobj, user_id: int) -> ImportReport:
+    report = ImportReport()
+    uploaded: list[Item] = []
+
+    # decode/encode is CPU bound and goes to processes, uploads are I/O bound
+    ctx = multiprocessing.get_context("spawn")
+
+    with (
+        zipfile.ZipFile(fileobj) as archive,
+        ProcessPoolExecutor(max_workers=IMPORT_PROCESS_WORKERS, mp_context=ctx) as process_pool,
+        ThreadPoolExecutor(max_workers=IMPORT_UPLOAD_CONCURRENCY) as upload_pool,
+    ):
+        records = read_records(archive, report)
+        names = set(archive.namelist())
+        chunk = []
+
+        for row_number, record, image_name in records:
+            if image_name not in names:
+                report.error(row_number, f"Image {image_name} not found in archive")
+                continue
+
+            if archive.getinfo(image_name).file_size > MAX_IMAGE_BYTES:
+                report.error(row_number, f"Image {image_name} exceeds {MAX_IMAGE_BYTES // 1024 // 1024}MB")
+                continue
+
+            chunk.append((row_number, record, image_name, archive.read(image_name)))
+
+            if len(chunk) >= IMPORT_CHUNK_SIZE:
+                uploaded += process_chunk(chunk, user_id, process_pool, upload_pool, report)
+                chunk = []
+
+        if chunk:
+            uploaded += process_chunk(chunk, user_id, process_pool, upload_pool, report)
+
+    if not uploaded:
+        return report
+
+    # stamped at insert time, not when the item was built minutes ago;
+    # updated_at comes from the database as the rows are copied
+    now = datetime.now(timezone.utc)
+    rows = [{**item.model_dump(exclude={"updated_at"}), "created_at": now} for item in uploaded]
+
+    with Session(engine) as session:
+        try:
+            copy_items(session, rows)
+            session.commit()
+        except Exception:
+            session.rollback()
+
+            # don't leave the uploaded objects behind
+            for item in uploaded:
+                enqueue_delete(session, item.image)
+            session.commit()
+            raise
+
+    report.imported = len(uploaded)
+    report.errors.sort(key=lambda error: error["row"])
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("archive")
+    parser.add_argument("--user", required=True, help="public_id of the account the items are posted as")
+    args = parser.parse_args()
+
+    with Session(engine) as session:
+        user = session.exec(select(User).where(User.public_id == args.user)).first()
+
+    if not user:
+        parser.error(f"User {args.user} not found")
+
+    with open(args.archive, "rb") as f:
+        report = import_archive(f, user.id)
+
+    print(json.dumps({"imported": report.imported, "errors": report.errors}, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
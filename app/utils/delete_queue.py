@@ -0,0 +1,135 @@
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import delete
+from sqlmodel import Session, select
+
+from app.db.db import engine
+from app.models.item_tombstone import ItemTombstone
+from app.models.pending_delete import PendingDelete
+from app.utils.s3_service import delete_s3_objects
+
+DELETE_BATCH_SIZE = 1000  # DeleteObjects limit
+DELETE_POLL_SECONDS = float(os.getenv("DELETE_POLL_SECONDS", "10"))
+DELETE_MAX_BACKOFF_SECONDS = 3600
+
+# delta sync cursors older than this are rejected, so tombstones past it can go
+TOMBSTONE_RETENTION = timedelta(days=int(os.getenv("TOMBSTONE_RETENTION_DAYS", "30")))
+TOMBSTONE_PRUNE_SECONDS = 3600
+
+
+def enqueue_delete(session: Session, key: str):
+    """
+    Record a bucket object for deletion. Added to the caller's session so it
+    commits (or rolls back) together with the row delete.
+    """
+    session.add(PendingDelete(key=key))
+
+
+class DeleteWorker:
+    """
+    Background thread that drains pending_deletes in DeleteObjects batches.
+    Rows are claimed with SKIP LOCKED so several API instances can run it.
+    Also prunes item tombstones past TOMBSTONE_RETENTION.
+    """
+
+    def __init__(self):
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pruned_at = None
+
+    def start(self):
+        if self._thread:
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="delete-worker", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=10):
+        self._stop.set()
+        self._wake.set()
+
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def notify(self):
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.clear()
+
+            try:
+                # keep going while batches come back full
+                while not self._stop.is_set() and self.drain_once() == DELETE_BATCH_SIZE:
+                    pass
+            except Exception as e:
+                print(f"Delete queue drain failed: {e}")
+
+            if self._pruned_at is None or time.monotonic() - self._pruned_at > TOMBSTONE_PRUNE_SECONDS:
+                try:
+                    self.prune_tombstones()
+                except Exception as e:
+                    print(f"Tombstone prune failed: {e}")
+
+                self._pruned_at = time.monotonic()
+
+            self._wake.wait(DELETE_POLL_SECONDS)
+
+    def prune_tombstones(self) -> int:
+        cutoff = datetime.now(timezone.utc) - TOMBSTONE_RETENTION
+
+        with Session(engine) as session:
+            result = session.exec(delete(ItemTombstone).where(ItemTombstone.deleted_at < cutoff))
+            session.commit()
+
+        return result.rowcount
+
+    def drain_once(self) -> int:
+        now = datetime.now(timezone.utc)
+
+        with Session(engine) as session:
+            batch = session.exec(
+                select(PendingDelete)
+                .where(PendingDelete.next_attempt_at <= now)
+                .order_by(PendingDelete.id)
+                .limit(DELETE_BATCH_SIZE)
+                .with_for_update(skip_locked=True)
+            ).all()
+
+            if not batch:
+                return 0
+
+            keys = list({row.key for row in batch})
+
+            try:
+                failed = delete_s3_objects(keys)
+            except Exception as e:
+                # whole request failed, retry every row
+                failed = {key: str(e) for key in keys}
+
+            done_ids = [row.id for row in batch if row.key not in failed]
+
+            if done_ids:
+                session.exec(delete(PendingDelete).where(PendingDelete.id.in_(done_ids)))
+
+            for row in batch:
+                if row.key in failed:
+                    row.attempts += 1
+                    row.last_error = failed[row.key][:500]
+                    row.next_attempt_at = now + timedelta(seconds=min(2 ** row.attempts, DELETE_MAX_BACKOFF_SECONDS))
+                    session.add(row)
+
+            session.commit()
+
+            if failed:
+                print(f"Delete queue: {len(failed)} of {len(keys)} keys failed, will retry")
+
+            return len(batch)
+
+
+delete_worker = DeleteWorker()
@@ -0,0 +1,104 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+
+class DiskLRUCache:
+    """
+    Size-bounded file cache. Entries live as plain files under root, so a hit
+    is a single stat + file read (or sendfile); the LRU order is kept in memory
+    and rebuilt from mtimes on startup.
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, int] = OrderedDict()  # name -> size, oldest first
+        self._size = 0
+
+        os.makedirs(root, exist_ok=True)
+        self._load()
+
+    @staticmethod
+    def name_for(*parts) -> str:
+        return hashlib.sha1("|".join(str(p) for p in parts).encode()).hexdigest()
+
+    def _load(self):
+        files = []
+
+        for name in os.listdir(self.root):
+            if name.endswith(".tmp"):
+                os.remove(os.path.join(self.root, name))
+                continue
+
+            st = os.stat(os.path.join(self.root, name))
+            files.append((st.st_mtime, name, st.st_size))
+
+        for _, name, size in sorted(files):
+            self._entries[name] = size
+            self._size += size
+
+        self._evict()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    def get(self, name: str) -> Optional[str]:
+        with self._lock:
+            if name not in self._entries:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(name)
+            self.hits += 1
+
+        return self.path(name)
+
+    def put(self, name: str, data: bytes) -> str:
+        path = self.path(name)
+
+        # write then rename, readers never see partial files
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+        with self._lock:
+            self._size -= self._entries.pop(name, 0)
+            self._entries[name] = len(data)
+            self._size += len(data)
+            self._evict()
+
+        return path
+
+    def delete(self, name: str):
+        with self._lock:
+            size = self._entries.pop(name, None)
+            if size is None:
+                return
+
+            self._size -= size
+
+        try:
+            os.remove(self.path(name))
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        while self._size > self.max_bytes and self._entries:
+            name, size = self._entries.popitem(last=False)
+            self._size -= size
+
+            try:
+                os.remove(self.path(name))
+            except FileNotFoundError:
+                pass
+
+    def size(self) -> int:
+        return self._size
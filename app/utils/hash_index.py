@@ -0,0 +1,120 @@
+import threading
+import uuid
+from itertools import combinations
+from sqlmodel import select
+
+from app.models.item import Item
+from app.utils.phash import HASH_BITS, to_unsigned
+from app.utils.synced_index import SyncedIndex
+
+CHUNKS = 4
+CHUNK_BITS = HASH_BITS // CHUNKS
+CHUNK_MASK = (1 << CHUNK_BITS) - 1
+
+
+def _flip_masks(max_flips: int) -> list[int]:
+    masks = [0]
+
+    for k in range(1, max_flips + 1):
+        for bits in combinations(range(CHUNK_BITS), k):
+            masks.append(sum(1 << b for b in bits))
+
+    return masks
+
+
+class HashIndex(SyncedIndex):
+    """
+    Multi-index hashing over 64-bit hashes split into 4 x 16-bit chunks.
+
+    If two hashes are within distance r, at least one chunk is within
+    r // 4 of the query's chunk (pigeonhole), so a lookup probes only the
+    chunk buckets at that distance and verifies candidates with a popcount.
+    """
+
+    name = "hash-index"
+    yield_per = 5000
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._hashes: dict[uuid.UUID, int] = {}
+        self._tables: list[dict[int, set[uuid.UUID]]] = [{} for _ in range(CHUNKS)]
+        self._masks: dict[int, list[int]] = {}
+
+    @staticmethod
+    def _chunks(value: int) -> list[int]:
+        return [(value >> (i * CHUNK_BITS)) & CHUNK_MASK for i in range(CHUNKS)]
+
+    def add(self, item_id: uuid.UUID, value: int):
+        value = to_unsigned(value)
+
+        with self._lock:
+            self._remove(item_id)
+            self._hashes[item_id] = value
+
+            for table, chunk in zip(self._tables, self._chunks(value)):
+                table.setdefault(chunk, set()).add(item_id)
+
+    def remove(self, item_id: uuid.UUID):
+        with self._lock:
+            self._remove(item_id)
+
+    def _remove(self, item_id: uuid.UUID):
+        value = self._hashes.pop(item_id, None)
+        if value is None:
+            return
+
+        for table, chunk in zip(self._tables, self._chunks(value)):
+            bucket = table.get(chunk)
+            if bucket:
+                bucket.discard(item_id)
+                if not bucket:
+                    del table[chunk]
+
+    def search(self, value: int, max_distance: int) -> list[tuple[int, uuid.UUID]]:
+        """
+        (distance, item_id) pairs within max_distance, closest first.
+        """
+        value = to_unsigned(value)
+        flips = max_distance // CHUNKS
+
+        if flips not in self._masks:
+            self._masks[flips] = _flip_masks(flips)
+
+        masks = self._masks[flips]
+        candidates = set()
+
+        with self._lock:
+            for table, chunk in zip(self._tables, self._chunks(value)):
+                for mask in masks:
+                    bucket = table.get(chunk ^ mask)
+                    if bucket:
+                        candidates |= bucket
+
+            results = []
+            for item_id in candidates:
+                distance = (self._hashes[item_id] ^ value).bit_count()
+                if distance <= max_distance:
+                    results.append((distance, item_id))
+
+        results.sort(key=lambda r: r[0])
+        return results
+
+    def __len__(self):
+        return len(self._hashes)
+
+    def _changes_query(self, since):
+        query = select(Item.id, Item.image_hash, Item.updated_at).where(Item.image_hash != None)
+
+        if since is not None:
+            query = query.where(Item.updated_at > since)
+
+        return query
+
+    def _apply(self, row):
+        item_id, value, updated_at = row
+        self.add(item_id, value)
+        return updated_at
+
+
+image_index = HashIndex()
@@ -0,0 +1,53 @@
+"""
+Disk cache behind the /images resize proxy: rendered variants plus the
+source image they were rendered from.
+"""
+import bisect
+import os
+
+from app.utils.disk_cache import DiskLRUCache
+from app.utils.metrics import CallbackMetric
+from app.utils.s3_service import VARIANT_FORMATS
+
+IMAGE_CACHE_DIR = os.getenv("IMAGE_CACHE_DIR", "/tmp/retrievo-image-cache")
+IMAGE_CACHE_MAX_MB = int(os.getenv("IMAGE_CACHE_MAX_MB", "512"))
+
+# requested widths are snapped up to one of these, so the cache can't be
+# blown up with one entry per pixel width
+PROXY_WIDTHS = [64, 128, 256, 384, 512, 768, 1024, 1400]
+
+cache = DiskLRUCache(IMAGE_CACHE_DIR, IMAGE_CACHE_MAX_MB * 1024 * 1024)
+
+CallbackMetric(
+    "image_cache_lookups_total", "Resize proxy disk cache lookups.", "counter", ("result",),
+    lambda: {("hit",): cache.hits, ("miss",): cache.misses},
+)
+CallbackMetric(
+    "image_cache_hit_ratio", "Resize proxy disk cache hit ratio since startup.", "gauge", (),
+    lambda: {(): cache.hits / max(1, cache.hits + cache.misses)},
+)
+
+
+def snap_width(w: int) -> int:
+    i = bisect.bisect_left(PROXY_WIDTHS, w)
+    return PROXY_WIDTHS[min(i, len(PROXY_WIDTHS) - 1)]
+
+
+def source_name(key: str) -> str:
+    return DiskLRUCache.name_for(key, "src")
+
+
+def variant_name(key: str, width: int, fmt: str) -> str:
+    return DiskLRUCache.name_for(key, width, fmt)
+
+
+def evict_image(key: str):
+    """
+    Drop the cached source and every variant of an image, for items that are
+    deleted or hidden.
+    """
+    cache.delete(source_name(key))
+
+    for width in PROXY_WIDTHS:
+        for fmt in VARIANT_FORMATS:
+            cache.delete(variant_name(key, width, fmt))
@@ -0,0 +1,55 @@
+import asyncio
+import contextvars
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from app.utils.metrics import CallbackMetric
+
+# Pillow releases the GIL while decoding/encoding, so threads are enough here
+IMAGE_POOL_WORKERS = int(os.getenv("IMAGE_POOL_WORKERS", "2"))
+
+_executor = ThreadPoolExecutor(max_workers=IMAGE_POOL_WORKERS, thread_name_prefix="image-pool")
+
+_lock = threading.Lock()
+_pending = 0
+
+
+def _done(_: Future):
+    global _pending
+    with _lock:
+        _pending -= 1
+
+
+def submit(fn, *args, **kwargs) -> Future:
+    """
+    Queue a job on the image pool. Exceptions are kept on the returned future.
+    """
+    global _pending
+    with _lock:
+        _pending += 1
+
+    # carry the caller's context (trace span) into the worker thread
+    future = _executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+    future.add_done_callback(_done)
+
+    return future
+
+
+async def run(fn, *args, **kwargs):
+    """
+    Run a job on the image pool and wait for it without blocking the event loop.
+    """
+    return await asyncio.wrap_future(submit(fn, *args, **kwargs))
+
+
+def queue_depth() -> int:
+    # queued + running jobs
+    return _pending
+
+
+CallbackMetric("image_pool_queue_depth", "Queued + running image pool jobs.", "gauge", (), lambda: {(): _pending})
+
+
+def shutdown():
+    _executor.shutdown(wait=True, cancel_futures=False)
@@ -0,0 +1,228 @@
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from sqlmodel import Session, select
+
+from app.db.db import engine
+from app.models.item import Item
+from app.utils.s3_service import head_s3_object, upload_file_to_s3
+
+# Processed images are written here first and forwarded to the bucket by
+# SpoolUploader, so item creation never waits on object storage. Must survive
+# a restart: a pending item's only copy of its image lives here.
+SPOOL_DIR = os.getenv("IMAGE_SPOOL_DIR", "/var/lib/retrievo/spool")
+SPOOL_UPLOAD_CONCURRENCY = int(os.getenv("SPOOL_UPLOAD_CONCURRENCY", "4"))
+SPOOL_POLL_SECONDS = float(os.getenv("SPOOL_POLL_SECONDS", "5"))
+SPOOL_MAX_BACKOFF_SECONDS = 300
+
+PART_SUFFIX = ".part"
+
+
+def write_part(item_id: uuid.UUID, data: bytes) -> str:
+    """
+    Write the image under a temporary name. It only becomes visible to the
+    uploader after commit_part, i.e. once the item row is committed.
+    """
+    os.makedirs(SPOOL_DIR, exist_ok=True)
+
+    path = os.path.join(SPOOL_DIR, f"{item_id}{PART_SUFFIX}")
+    with open(path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+    return path
+
+
+def commit_part(part_path: str):
+    os.replace(part_path, part_path[: -len(PART_SUFFIX)])
+    spool_uploader.notify()
+
+
+def discard_part(part_path: str):
+    try:
+        os.remove(part_path)
+    except FileNotFoundError:
+        pass
+
+
+class SpoolUploader:
+    """
+    Background thread that flushes spooled images to the bucket with bounded
+    concurrency and exponential backoff, then marks the items ready.
+    """
+
+    def __init__(self):
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._attempts: dict[str, int] = {}
+        self._retry_at: dict[str, float] = {}
+        self._started_at = None
+
+    def start(self):
+        if self._thread:
+            return
+
+        os.makedirs(SPOOL_DIR, exist_ok=True)
+        self._started_at = datetime.now(timezone.utc)
+
+        # before any request can write a part, so every part left is stale
+        self._recover_parts()
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="spool-uploader", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=10):
+        self._stop.set()
+        self._wake.set()
+
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def notify(self):
+        self._wake.set()
+
+    def pending(self) -> int:
+        try:
+            return sum(1 for name in os.listdir(SPOOL_DIR) if not name.endswith(PART_SUFFIX))
+        except FileNotFoundError:
+            return 0
+
+    def _recover_parts(self):
+        """
+        Parts left by a crash between writing the image and commit_part. If
+        the item row was committed the part is the image, otherwise it is
+        garbage.
+        """
+        parts = [name for name in os.listdir(SPOOL_DIR) if name.endswith(PART_SUFFIX)]
+        if not parts:
+            return
+
+        with Session(engine) as session:
+            for name in parts:
+                path = os.path.join(SPOOL_DIR, name)
+
+                try:
+                    item = session.get(Item, uuid.UUID(name[: -len(PART_SUFFIX)]))
+                except ValueError:
+                    item = None
+
+                if item and item.image_status == "pending":
+                    print(f"Recovering spooled image {name}")
+                    os.replace(path, path[: -len(PART_SUFFIX)])
+                else:
+                    os.remove(path)
+
+    def _recover_pending(self):
+        """
+        Items left pending with nothing in the spool (e.g. the spool was on a
+        wiped disk, or the process died between the upload and marking the item
+        ready). Marked ready if the image made it to the bucket, failed otherwise,
+        so they don't stay pending forever.
+        """
+        with Session(engine) as session:
+            items = session.exec(
+                select(Item)
+                .where(Item.image_status == "pending")
+                .where(Item.created_at < self._started_at)
+            ).all()
+
+            for item in items:
+                name = str(item.id)
+                if os.path.exists(os.path.join(SPOOL_DIR, name)):
+                    continue
+
+                if head_s3_object(item.image):
+                    item.image_status = "ready"
+                else:
+                    print(f"Spooled image for item {name} was lost")
+                    item.image_status = "failed"
+
+                session.add(item)
+
+            session.commit()
+
+    def _run(self):
+        try:
+            self._recover_pending()
+        except Exception as e:
+            print(f"Spool recovery failed: {e}")
+
+        with ThreadPoolExecutor(max_workers=SPOOL_UPLOAD_CONCURRENCY, thread_name_prefix="spool-upload") as executor:
+            while not self._stop.is_set():
+                self._wake.clear()
+
+                try:
+                    self._flush(executor)
+                except Exception as e:
+                    print(f"Spool flush failed: {e}")
+
+                self._wake.wait(SPOOL_POLL_SECONDS)
+
+    def _due_files(self) -> list[str]:
+        now = time.monotonic()
+        names = []
+
+        for name in os.listdir(SPOOL_DIR):
+            if name.endswith(PART_SUFFIX):
+                continue
+
+            if self._retry_at.get(name, 0) > now:
+                continue
+
+            names.append(name)
+
+        return names
+
+    def _flush(self, executor: ThreadPoolExecutor):
+        names = self._due_files()
+
+        # map() keeps at most SPOOL_UPLOAD_CONCURRENCY uploads in flight
+        for name, ok in zip(names, executor.map(self._upload_one, names)):
+            if ok:
+                self._attempts.pop(name, None)
+                self._retry_at.pop(name, None)
+            else:
+                attempts = self._attempts.get(name, 0) + 1
+                self._attempts[name] = attempts
+                self._retry_at[name] = time.monotonic() + min(2 ** attempts, SPOOL_MAX_BACKOFF_SECONDS)
+
+    def _upload_one(self, name: str) -> bool:
+        path = os.path.join(SPOOL_DIR, name)
+
+        try:
+            item_id = uuid.UUID(name)
+        except ValueError:
+            print(f"Removing unexpected spool file {name}")
+            os.remove(path)
+            return True
+
+        try:
+            with Session(engine) as session:
+                item = session.get(Item, item_id)
+
+                # item deleted before its image was flushed
+                if not item or item.image_status == "ready":
+                    os.remove(path)
+                    return True
+
+                upload_file_to_s3(path, item.image)
+
+                item.image_status = "ready"
+                session.add(item)
+                session.commit()
+
+            os.remove(path)
+            return True
+        except Exception as e:
+            print(f"Error uploading spooled image {name}: {e}")
+            return False
+
+
+spool_uploader = SpoolUploader()
@@ -0,0 +1,120 @@
+import os
+import threading
+import uuid
+from collections import deque
+from concurrent.futures import Future
+from datetime import datetime
+from sqlmodel import Session, select
+
+from app.db.db import engine
+from app.models.item import Item
+from app.utils import image_pool
+from app.utils.hash_index import image_index
+from app.utils.metrics import CallbackMetric
+from app.utils.s3_service import STAGING_FOLDER, compress_image, delete_s3_object, download_s3_object, upload_to_s3
+
+# staged images share the image pool with /items/create; at most this many are
+# in the pool at once, so admitted uploads never wait behind a burst of finalizes
+STAGED_POOL_SLOTS = int(os.getenv("STAGED_POOL_SLOTS", "1"))
+
+# finalized images waiting for a slot, /items/finalize is refused beyond this
+STAGED_QUEUE_SIZE = int(os.getenv("STAGED_QUEUE_SIZE", "64"))
+
+_lock = threading.Lock()
+_waiting: deque[tuple[uuid.UUID, str]] = deque()
+_running = 0
+
+
+def process_staged_image(item_id: uuid.UUID, staged_key: str):
+    """
+    Compress an image the client uploaded to the staging area and point the
+    item at the compressed copy. Runs on the image pool, outside any request.
+    """
+    try:
+        raw_bytes = download_s3_object(staged_key)
+        buffer, ext, meta = compress_image(raw_bytes)
+        s3_key = upload_to_s3(buffer, ext)
+    except Exception as e:
+        # item keeps serving the staged original
+        print(f"Error processing staged image {staged_key}: {e}")
+        return
+
+    with Session(engine) as session:
+        item = session.get(Item, item_id)
+
+        if not item or item.image != staged_key:
+            # item was deleted or changed meanwhile
+            delete_s3_object(s3_key)
+            return
+
+        item.image = s3_key
+        item.image_width = meta["width"]
+        item.image_height = meta["height"]
+        item.image_blurhash = meta["blurhash"]
+        item.image_hash = meta["phash"]
+        session.add(item)
+        session.commit()
+
+    image_index.add(item_id, meta["phash"])
+
+    delete_s3_object(staged_key)
+
+
+def staged_queue_full() -> bool:
+    return len(_waiting) >= STAGED_QUEUE_SIZE
+
+
+def queue_staged_image(item_id: uuid.UUID, staged_key: str):
+    """
+    Run process_staged_image on the image pool once one of its slots is free.
+    Callers check staged_queue_full() first, the queue itself never refuses.
+    """
+    global _running
+    with _lock:
+        if _running >= STAGED_POOL_SLOTS:
+            _waiting.append((item_id, staged_key))
+            return
+
+        _running += 1
+
+    _submit(item_id, staged_key)
+
+
+def _submit(item_id: uuid.UUID, staged_key: str):
+    image_pool.submit(process_staged_image, item_id, staged_key).add_done_callback(_next)
+
+
+def _next(_: Future):
+    # hand the finished job's slot to the oldest waiting image
+    global _running
+    with _lock:
+        if not _waiting:
+            _running -= 1
+            return
+
+        item_id, staged_key = _waiting.popleft()
+
+    _submit(item_id, staged_key)
+
+
+CallbackMetric("staged_image_queue_depth", "Finalized images waiting for an image pool slot.", "gauge", (), lambda: {(): len(_waiting)})
+
+
+def requeue_staged_images(before: datetime):
+    """
+    Re-submit items created before `before` that still point at their staged
+    upload: the process stopped before process_staged_image ran, or it failed.
+    Called once on startup.
+    """
+    with Session(engine) as session:
+        staged = session.exec(
+            select(Item.id, Item.image)
+            .where(Item.image.like(f"{STAGING_FOLDER}/%"))
+            .where(Item.created_at < before)
+        ).all()
+
+    for item_id, staged_key in staged:
+        queue_staged_image(item_id, staged_key)
+
+    if staged:
+        print(f"Re-queued {len(staged)} staged images")
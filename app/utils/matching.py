@@ -0,0 +1,245 @@
+import re
+import threading
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+import numpy as np
+from sqlmodel import Session, select
+
+from app.models.item import Item
+from app.models.notification import Notification
+from app.models.user import User
+from app.utils.synced_index import SyncedIndex
+
+# candidates further apart than this are never matched
+MATCH_MAX_DAYS = 60
+# date proximity decays with this scale (days)
+MATCH_DATE_SCALE_DAYS = 14
+
+TEXT_WEIGHT = 0.7
+DATE_WEIGHT = 0.3
+
+# notify owners at or above this score, for at most this many matches per new item
+MATCH_NOTIFY_THRESHOLD = 0.6
+MATCH_NOTIFY_LIMIT = 3
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = {
+    "a", "an", "and", "at", "by", "for", "from", "in", "is", "it", "my", "near",
+    "of", "on", "or", "the", "to", "was", "with", "found", "lost", "i", "me",
+}
+
+
+def tokenize(text: str) -> list[str]:
+    return [t for t in TOKEN_RE.findall(text.lower()) if len(t) > 1 and t not in STOPWORDS]
+
+
+@dataclass
+class MatchDoc:
+    item_id: uuid.UUID
+    user_id: int
+    type: str
+    category: str
+    visibility: str
+    date: datetime
+    term_ids: np.ndarray  # int32
+    counts: np.ndarray  # float32
+
+
+def visibility_compatible(a: str, b: str) -> bool:
+    return a == "public" or b == "public" or a == b
+
+
+class MatchIndex(SyncedIndex):
+    """
+    In-memory lost<->found index. Documents keep raw term counts; TF-IDF
+    weights are computed at query time from the current document frequencies,
+    so adding or removing an item is O(terms) and never needs a rebuild.
+    """
+
+    name = "match-index"
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+
+        self._vocab: dict[str, int] = {}
+        self._df = np.zeros(1024, dtype=np.float32)
+        self._docs: dict[uuid.UUID, MatchDoc] = {}
+        self._buckets: dict[tuple[str, str], set[uuid.UUID]] = {}  # (type, category) -> ids
+
+    def _term_id(self, token: str) -> int:
+        term_id = self._vocab.get(token)
+
+        if term_id is None:
+            term_id = len(self._vocab)
+            self._vocab[token] = term_id
+
+            if term_id >= len(self._df):
+                self._df = np.concatenate([self._df, np.zeros(len(self._df), dtype=np.float32)])
+
+        return term_id
+
+    def add(self, item: Item):
+        tokens = tokenize(f"{item.title} {item.description} {item.location}")
+
+        with self._lock:
+            self._remove(item.id)
+
+            if item.is_hidden:
+                return
+
+            counts: dict[int, int] = {}
+            for token in tokens:
+                term_id = self._term_id(token)
+                counts[term_id] = counts.get(term_id, 0) + 1
+
+            term_ids = np.fromiter(counts.keys(), dtype=np.int32, count=len(counts))
+            doc = MatchDoc(
+                item_id=item.id,
+                user_id=item.user_id,
+                type=item.type,
+                category=item.category,
+                visibility=item.visibility,
+                date=item.date.replace(tzinfo=None),  # compare like the DB stores it
+                term_ids=term_ids,
+                counts=np.fromiter(counts.values(), dtype=np.float32, count=len(counts)),
+            )
+
+            self._df[term_ids] += 1
+            self._docs[item.id] = doc
+            self._buckets.setdefault((item.type, item.category), set()).add(item.id)
+
+    def remove(self, item_id: uuid.UUID):
+        with self._lock:
+            self._remove(item_id)
+
+    def _remove(self, item_id: uuid.UUID):
+        doc = self._docs.pop(item_id, None)
+        if not doc:
+            return
+
+        self._df[doc.term_ids] -= 1
+        self._buckets.get((doc.type, doc.category), set()).discard(item_id)
+
+    def matches(self, item_id: uuid.UUID, limit=10, min_score=0.0) -> list[tuple[float, uuid.UUID]]:
+        """
+        (score, item_id) of opposite-type candidates, best first.
+        """
+        with self._lock:
+            doc = self._docs.get(item_id)
+            if not doc or not len(doc.term_ids):
+                return []
+
+            opposite = "found" if doc.type == "lost" else "lost"
+            max_gap = timedelta(days=MATCH_MAX_DAYS)
+
+            if doc.category == "others":
+                buckets = [ids for (kind, _), ids in self._buckets.items() if kind == opposite]
+            else:
+                buckets = [self._buckets.get((opposite, doc.category), ()), self._buckets.get((opposite, "others"), ())]
+
+            candidates = [
+                other
+                for ids in buckets
+                for other in (self._docs[i] for i in ids)
+                if other.user_id != doc.user_id
+                and len(other.term_ids)
+                and visibility_compatible(doc.visibility, other.visibility)
+                and abs(other.date - doc.date) <= max_gap
+            ]
+
+            if not candidates:
+                return []
+
+            n_docs = len(self._docs)
+            idf = np.log((1 + n_docs) / (1 + self._df[: len(self._vocab)])) + 1
+
+            # dense query vector over the vocabulary
+            query = np.zeros(len(self._vocab), dtype=np.float32)
+            query[doc.term_ids] = doc.counts * idf[doc.term_ids]
+            query_norm = np.linalg.norm(query)
+
+            # all candidates flattened into one array, reduced per segment
+            lengths = np.fromiter((len(c.term_ids) for c in candidates), dtype=np.int64, count=len(candidates))
+            offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+            term_ids = np.concatenate([c.term_ids for c in candidates])
+            weights = np.concatenate([c.counts for c in candidates]) * idf[term_ids]
+
+            norms = np.sqrt(np.add.reduceat(weights * weights, offsets))
+            dots = np.add.reduceat(weights * query[term_ids], offsets)
+            text_scores = dots / (norms * query_norm)
+
+            days = np.fromiter(
+                (abs((c.date - doc.date).total_seconds()) / 86400 for c in candidates),
+                dtype=np.float64,
+                count=len(candidates),
+            )
+            date_scores = np.exp(-days / MATCH_DATE_SCALE_DAYS)
+
+            scores = TEXT_WEIGHT * text_scores + DATE_WEIGHT * date_scores
+
+        order = np.argsort(-scores)[:limit]
+
+        return [
+            (float(scores[i]), candidates[i].item_id)
+            for i in order
+            if scores[i] >= min_score
+        ]
+
+    def _changes_query(self, since):
+        # hidden items coming through later syncs are dropped by add()
+        if since is None:
+            return select(Item).where(Item.is_hidden == False)
+
+        return select(Item).where(Item.updated_at > since)
+
+    def _apply(self, item):
+        self.add(item)
+        return item.updated_at
+
+
+match_index = MatchIndex()
+
+
+def notify_matches(session: Session, item: Item):
+    """
+    Tell owners of lost items about high-confidence found matches for a new item.
+    """
+    match_index.ensure_synced()
+
+    scored = match_index.matches(item.id, limit=MATCH_NOTIFY_LIMIT, min_score=MATCH_NOTIFY_THRESHOLD)
+    if not scored:
+        return
+
+    query = (
+        select(Item)
+        .where(Item.id.in_([item_id for _, item_id in scored]))
+        .where(Item.is_hidden == False)
+    )
+
+    # the lost item's owner is notified and must be allowed to see the found
+    # item; the index only checks that the two could match
+    if item.type == "lost":
+        owner_hostel = select(User.hostel).where(User.id == item.user_id).scalar_subquery()
+        query = query.where((Item.visibility == "public") | (Item.visibility == owner_hostel))
+    elif item.visibility != "public":
+        query = query.join(User, User.id == Item.user_id).where(User.hostel == item.visibility)
+
+    matched_items = session.exec(query).all()
+
+    notifications = []
+
+    for other in matched_items:
+        lost, found = (item, other) if item.type == "lost" else (other, item)
+
+        notifications.append(Notification(
+            user_id=lost.user_id,
+            type="match_found",
+            title="Possible match for your lost item",
+            message=f"A found item '{found.title}' looks like your lost item '{lost.title}'.",
+            item_id=found.id,
+        ))
+
+    session.add_all(notifications)
+    session.commit()
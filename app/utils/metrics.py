@@ -0,0 +1,259 @@
+"""
+In-process metrics in the Prometheus text format, served at /metrics.
+
+Kept dependency-free and cheap: a metric is a dict of label tuple -> value
+behind one lock, and an observation is a bisect plus a few additions.
+Values are per process, which matches the single uvicorn worker we run.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Optional
+from sqlalchemy import event
+
+# Prometheus client defaults, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+_registry: list = []
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+
+    if extra:
+        pairs.append(extra)
+
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+
+        self._lock = threading.Lock()
+        self._values: dict[tuple, object] = {}
+
+        _registry.append(self)
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, labels, "", value) for labels, value in self._values.items()]
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+
+        for name, labels, extra, value in self.samples():
+            lines.append(f"{name}{_labels(self.labelnames, labels, extra)} {_number(value)}")
+
+        return lines
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def set(self, value, *labels):
+        with self._lock:
+            self._values[labels] = value
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *labels):
+        i = bisect.bisect_left(self.buckets, value)
+
+        with self._lock:
+            state = self._values.get(labels)
+
+            if state is None:
+                # per-bucket counts (last is +Inf), sum
+                state = [[0] * (len(self.buckets) + 1), 0.0]
+                self._values[labels] = state
+
+            state[0][i] += 1
+            state[1] += value
+
+    def samples(self):
+        with self._lock:
+            snapshot = [(labels, list(counts), total) for labels, (counts, total) in self._values.items()]
+
+        samples = []
+
+        for labels, counts, total in snapshot:
+            cumulative = 0
+
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                samples.append((f"{self.name}_bucket", labels, f'le="{_number(bound)}"', cumulative))
+
+            samples.append((f"{self.name}_sum", labels, "", total))
+            samples.append((f"{self.name}_count", labels, "", cumulative))
+
+        return samples
+
+    @contextmanager
+    def time(self, *labels):
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+
+class CallbackMetric(Metric):
+    """
+    Read at scrape time from state another module already keeps
+    (cache counters, admission stats), so the hot path pays nothing.
+    """
+
+    def __init__(self, name: str, help: str, type: str, labelnames: tuple, callback: Callable[[], dict]):
+        super().__init__(name, help, labelnames)
+        self.type = type
+        self.callback = callback
+
+    def samples(self):
+        return [(self.name, labels, "", value) for labels, value in self.callback().items()]
+
+
+def render() -> str:
+    return "\n".join(line for metric in _registry for line in metric.render()) + "\n"
+
+
+# HTTP
+HTTP_REQUESTS = Counter("http_requests_total", "Requests by route template and status code.", ("method", "route", "status"))
+HTTP_LATENCY = Histogram("http_request_duration_seconds", "Request latency by route template.", ("method", "route"))
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "Requests currently being served.")
+
+# Database
+DB_QUERY_SECONDS = Histogram("db_query_duration_seconds", "Duration of individual SQL statements.")
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request", "SQL statements issued per request.", ("route",), buckets=QUERY_COUNT_BUCKETS
+)
+DB_SECONDS_PER_REQUEST = Histogram("db_seconds_per_request", "Time spent in SQL per request.", ("route",))
+
+# Object storage and images
+STORAGE_SECONDS = Histogram("storage_operation_duration_seconds", "Object storage call latency.", ("operation",))
+STORAGE_ERRORS = Counter("storage_operation_errors_total", "Failed object storage calls.", ("operation",))
+IMAGE_ENCODE_SECONDS = Histogram("image_encode_duration_seconds", "Image decode + resize + encode time.", ("operation", "preset"))
+
+
+# [query count, seconds in SQL] for the request being served. Threadpool
+# workers inherit the context, and the list is shared, so sync endpoints count too.
+_request_db: ContextVar[Optional[list]] = ContextVar("request_db", default=None)
+
+
+def instrument_engine(engine):
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        DB_QUERY_SECONDS.observe(elapsed)
+
+        stats = _request_db.get()
+        if stats is not None:
+            stats[0] += 1
+            stats[1] += elapsed
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context):
+        # failed statements never reach after_cursor_execute
+        starts = context.connection.info.get("query_start") if context.connection is not None else None
+        if starts:
+            starts.pop()
+
+
+@contextmanager
+def storage_timer(operation: str):
+    start = time.perf_counter()
+
+    try:
+        yield
+    except Exception:
+        STORAGE_ERRORS.inc(operation)
+        raise
+    finally:
+        STORAGE_SECONDS.observe(time.perf_counter() - start, operation)
+
+
+class MetricsMiddleware:
+    """
+    Per-request latency, status and SQL counts, labelled by route template
+    (/items/{item_id}, not the raw path) to keep cardinality bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status = 500
+        db_stats = [0, 0.0]
+        token = _request_db.set(db_stats)
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        start = time.perf_counter()
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_IN_FLIGHT.dec()
+            _request_db.reset(token)
+
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+
+            HTTP_REQUESTS.inc(method, template, str(status))
+            HTTP_LATENCY.observe(elapsed, method, template)
+            DB_QUERIES_PER_REQUEST.observe(db_stats[0], template)
+            DB_SECONDS_PER_REQUEST.observe(db_stats[1], template)
@@ -0,0 +1,56 @@
+import base64
+import uuid
+from datetime import datetime
+from typing import Optional
+from fastapi import HTTPException
+
+
+def encode_cursor(ts: datetime, item_id: uuid.UUID) -> str:
+    return base64.urlsafe_b64encode(f"{ts.isoformat()}|{item_id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        ts, item_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(ts), uuid.UUID(item_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def encode_changes_cursor(ts: datetime, item_id: uuid.UUID, snapshot: Optional[datetime] = None) -> str:
+    """
+    /items/changes cursor. Pages of the initial full sync also carry the
+    snapshot time that sync runs up to.
+    """
+    value = f"{ts.isoformat()}|{item_id}"
+    if snapshot is not None:
+        value += f"|{snapshot.isoformat()}"
+
+    return base64.urlsafe_b64encode(value.encode()).decode()
+
+
+def decode_changes_cursor(cursor: str) -> tuple[datetime, uuid.UUID, Optional[datetime]]:
+    try:
+        ts, item_id, *snapshot = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        if len(snapshot) > 1:
+            raise ValueError("Too many fields")
+
+        return (
+            datetime.fromisoformat(ts),
+            uuid.UUID(item_id),
+            datetime.fromisoformat(snapshot[0]) if snapshot else None,
+        )
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def encode_rank_cursor(rank: int, item_id: uuid.UUID) -> str:
+    return base64.urlsafe_b64encode(f"{rank}|{item_id}".encode()).decode()
+
+
+def decode_rank_cursor(cursor: str) -> tuple[int, uuid.UUID]:
+    try:
+        rank, item_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return int(rank), uuid.UUID(item_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
@@ -0,0 +1,23 @@
+import numpy as np
+from PIL import Image
+
+HASH_BITS = 64
+
+
+def dhash(img: Image.Image) -> int:
+    """
+    64-bit difference hash: sign of the horizontal gradient on a 9x8 grayscale thumbnail.
+    """
+    pixels = np.asarray(img.convert("L").resize((9, 8), Image.LANCZOS), dtype=np.int16)
+    bits = pixels[:, 1:] > pixels[:, :-1]
+
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def to_signed(value: int) -> int:
+    # Postgres BIGINT is signed
+    return value - (1 << HASH_BITS) if value >= 1 << (HASH_BITS - 1) else value
+
+
+def to_unsigned(value: int) -> int:
+    return value + (1 << HASH_BITS) if value < 0 else value
@@ -0,0 +1,219 @@
+"""
+On-demand sampling profiler for live requests.
+
+A request is profiled when an admin sends "X-Profile: 1", or at random with
+PROFILE_SAMPLE_RATE. A sampler thread snapshots stacks every
+PROFILE_INTERVAL_MS while the request runs and writes collapsed stacks
+(one "frame;frame;frame count" line per unique stack) to PROFILE_DIR, the
+input format of flamegraph.pl, speedscope and inferno.
+
+Event-loop samples are kept only while this request's own coroutine is on
+the stack. Worker-thread samples (sync endpoints, image pool) are kept
+whenever the thread is busy, so concurrent requests can show up there.
+
+When no request is profiled, the cost is one header scan and one random() call.
+"""
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Optional
+from fastapi.concurrency import run_in_threadpool
+from jose import JWTError, jwt
+from sqlmodel import Session, select
+
+from app.db.db import engine
+from app.models.user import User
+
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "/tmp/retrievo-profiles")
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+
+# profiles running at once; more requests asking to be profiled run unprofiled
+PROFILE_MAX_CONCURRENT = 2
+PROFILE_MAX_DEPTH = 128
+
+# leaf frames of a thread that is parked, not working
+IDLE_FUNCTIONS = {"wait", "select", "poll", "_worker"}
+
+STDLIB_DIR = os.path.dirname(os.__file__) + os.sep
+
+_slots = threading.BoundedSemaphore(PROFILE_MAX_CONCURRENT)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+
+    # shorten to package-relative paths
+    if filename.startswith(STDLIB_DIR):
+        filename = filename[len(STDLIB_DIR):]
+    elif "/site-packages/" in filename:
+        filename = filename.rsplit("/site-packages/", 1)[1]
+    elif "/app/" in filename:
+        filename = "app/" + filename.rsplit("/app/", 1)[1]
+
+    return f"{code.co_name} ({filename}:{frame.f_lineno})"
+
+
+def _stack(frame) -> list:
+    frames = []
+
+    while frame is not None and len(frames) < PROFILE_MAX_DEPTH:
+        frames.append(frame)
+        frame = frame.f_back
+
+    frames.reverse()
+    return frames
+
+
+class RequestProfiler:
+    def __init__(self, request_frame, loop_thread_id: int):
+        self.request_frame = request_frame
+        self.loop_thread_id = loop_thread_id
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._started = time.perf_counter()
+
+    def start(self):
+        self._thread.start()
+
+    def _run(self):
+        interval = PROFILE_INTERVAL_MS / 1000
+        own_id = threading.get_ident()
+        names = {}
+
+        while not self._stop.wait(interval):
+            self.sample_count += 1
+
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+
+                if thread_id == self.loop_thread_id:
+                    frames = _stack(frame)
+
+                    # only while this request's coroutine is running
+                    if self.request_frame not in frames:
+                        continue
+
+                    frames = frames[frames.index(self.request_frame):]
+                    root = "event-loop"
+                else:
+                    if frame.f_code.co_name in IDLE_FUNCTIONS:
+                        continue
+
+                    frames = _stack(frame)
+
+                    if thread_id not in names:
+                        names = {t.ident: t.name for t in threading.enumerate()}
+
+                    # drop the per-thread numbering so workers aggregate
+                    root = re.sub(r"[_-]?\d+$", "", names.get(thread_id, "thread"))
+
+                self.samples[";".join([root] + [_frame_label(f) for f in frames])] += 1
+
+    def stop(self, label: str):
+        self._stop.set()
+        elapsed_ms = int((time.perf_counter() - self._started) * 1000)
+
+        # join and write on a separate thread, off the request path
+        threading.Thread(target=self._finish, args=(label, elapsed_ms), daemon=True).start()
+
+    def _finish(self, label: str, elapsed_ms: int):
+        try:
+            self._thread.join()
+
+            if not self.samples:
+                return
+
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            safe_label = re.sub(r"[^A-Za-z0-9_.-]+", "_", label).strip("_")
+            path = os.path.join(PROFILE_DIR, f"{int(time.time())}-{safe_label}-{elapsed_ms}ms.collapsed")
+
+            with open(path, "w") as f:
+                for stack, count in self.samples.most_common():
+                    f.write(f"{stack} {count}\n")
+
+            print(f"Profile written: {path} ({self.sample_count} samples)")
+        except Exception as e:
+            print(f"Profile write failed: {e}")
+        finally:
+            _slots.release()
+
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+
+    return None
+
+
+def _admin_claim(authorization: Optional[str]) -> Optional[str]:
+    """
+    Subject of a valid token that claims the admin role, else None. No DB
+    access, so it can run on the event loop.
+    """
+    scheme, _, token = (authorization or "").partition(" ")
+
+    if scheme.lower() != "bearer" or not token:
+        return None
+
+    try:
+        payload = jwt.decode(token, os.getenv("JWT_SECRET"), algorithms=["HS256"])
+    except JWTError:
+        return None
+
+    if payload.get("role") != "admin":
+        return None
+
+    return payload.get("sub")
+
+
+def _is_admin(public_id: str) -> bool:
+    # the claim may be stale, check the DB like require_admin
+    with Session(engine) as session:
+        user = session.exec(select(User).where(User.public_id == public_id)).first()
+
+    return bool(user and user.role == "admin")
+
+
+class ProfilerMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def _wanted(self, scope) -> bool:
+        if _header(scope, b"x-profile") == "1":
+            # only tokens that claim admin cost a DB round trip
+            public_id = _admin_claim(_header(scope, b"authorization"))
+            return bool(public_id) and await run_in_threadpool(_is_admin, public_id)
+
+        return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not await self._wanted(scope):
+            return await self.app(scope, receive, send)
+
+        if not _slots.acquire(blocking=False):
+            return await self.app(scope, receive, send)
+
+        profiler = RequestProfiler(sys._getframe(), threading.get_ident())
+
+        try:
+            profiler.start()
+        except Exception:
+            _slots.release()
+            raise
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            route = scope.get("route")
+            profiler.stop(f"{scope['method']}-{getattr(route, 'path', None) or scope['path']}")
@@ -0,0 +1,181 @@
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from fastapi import HTTPException, Request
+from jose import JWTError, jwt
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.db.db import engine
+from app.models.rate_limit_bucket import RateLimitBucket
+
+# "memory" (per process) or "postgres" (shared by every worker/instance)
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+
+# memory backend: most recently used keys kept, older ones are dropped
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+
+# postgres backend: buckets idle this long are full again and can be deleted
+RATE_LIMIT_IDLE_SECONDS = 3600
+RATE_LIMIT_CLEANUP_EVERY = 1000
+
+
+@dataclass(frozen=True)
+class TokenBucket:
+    burst: int  # bucket size
+    rate: float  # tokens added per second
+
+
+def bucket_from_env(name: str, default: str) -> TokenBucket:
+    # RATE_LIMIT_<NAME>="<requests>/<seconds>", e.g. "10/600"
+    requests, seconds = os.getenv(f"RATE_LIMIT_{name.upper()}", default).split("/")
+    return TokenBucket(burst=int(requests), rate=int(requests) / float(seconds))
+
+
+POLICIES = {
+    # image decode/encode/upload
+    "items_create": bucket_from_env("items_create", "10/600"),
+    # outbound token verification; keyed by IP, and a campus shares few IPs
+    "auth_google": bucket_from_env("auth_google", "30/60"),
+    "items_report": bucket_from_env("items_report", "20/3600"),
+}
+
+
+class RateLimitStore:
+    def take(self, key: str, bucket: TokenBucket) -> float:
+        """
+        Take one token. Returns 0 if allowed, else seconds until a token is available.
+        """
+        raise NotImplementedError
+
+
+class MemoryStore(RateLimitStore):
+    """
+    Per-process buckets in an LRU dict: two floats per active key, O(1) per
+    request. Evicting a key only ever hands it a full bucket early.
+    """
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._buckets: OrderedDict[str, list[float]] = OrderedDict()
+
+    def take(self, key: str, bucket: TokenBucket) -> float:
+        now = time.monotonic()
+
+        with self._lock:
+            state = self._buckets.get(key)
+
+            if state is None:
+                state = [float(bucket.burst), now]
+                self._buckets[key] = state
+
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                state[0] = min(bucket.burst, state[0] + (now - state[1]) * bucket.rate)
+                state[1] = now
+
+            if state[0] >= 1:
+                state[0] -= 1
+                return 0
+
+            return (1 - state[0]) / bucket.rate
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class PostgresStore(RateLimitStore):
+    """
+    Buckets in rate_limit_buckets, shared across workers. One upsert per
+    request: refill and take happen in the ON CONFLICT update, which only
+    applies when a token is available.
+    """
+
+    def __init__(self):
+        self._calls = 0
+
+    def take(self, key: str, bucket: TokenBucket) -> float:
+        now = time.time()
+        refill = func.least(
+            bucket.burst,
+            RateLimitBucket.tokens + (now - RateLimitBucket.updated_at) * bucket.rate,
+        )
+
+        statement = (
+            insert(RateLimitBucket)
+            .values(key=key, tokens=bucket.burst - 1, updated_at=now)
+            .on_conflict_do_update(
+                index_elements=[RateLimitBucket.key],
+                set_={"tokens": refill - 1, "updated_at": now},
+                where=refill >= 1,
+            )
+            .returning(RateLimitBucket.tokens)
+        )
+
+        with engine.begin() as conn:
+            if conn.execute(statement).first() is not None:
+                self._maybe_cleanup(conn, now)
+                return 0
+
+            tokens = conn.execute(select(refill).where(RateLimitBucket.key == key)).scalar()
+
+        return (1 - (tokens or 0)) / bucket.rate
+
+    def _maybe_cleanup(self, conn, now: float):
+        self._calls += 1
+
+        if self._calls % RATE_LIMIT_CLEANUP_EVERY == 0:
+            conn.execute(delete(RateLimitBucket).where(RateLimitBucket.updated_at < now - RATE_LIMIT_IDLE_SECONDS))
+
+
+@lru_cache
+def get_store() -> RateLimitStore:
+    if RATE_LIMIT_BACKEND == "memory":
+        return MemoryStore()
+
+    if RATE_LIMIT_BACKEND == "postgres":
+        return PostgresStore()
+
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {RATE_LIMIT_BACKEND}")
+
+
+def client_key(request: Request) -> str:
+    """
+    JWT sub when the request carries a valid token, else the client IP.
+    """
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+
+    if scheme.lower() == "bearer" and token:
+        try:
+            payload = jwt.decode(token, os.getenv("JWT_SECRET"), algorithms=["HS256"])
+            return f"user:{payload['sub']}"
+        except (JWTError, KeyError):
+            pass
+
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+def rate_limit(policy: str):
+    """
+    Route dependency: dependencies=[Depends(rate_limit("items_create"))]
+    """
+    bucket = POLICIES[policy]
+
+    def dependency(request: Request):
+        wait = get_store().take(f"{policy}:{client_key(request)}", bucket)
+
+        if wait > 0:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests, try again later",
+                headers={"Retry-After": str(math.ceil(wait))},
+            )
+
+    return dependency
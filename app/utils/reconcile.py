@@ -0,0 +1,151 @@
+"""
+Bucket/DB reconciliation: find bucket objects no item points at.
+
+Both sides are streamed in key order and merge-joined, so memory stays flat
+regardless of bucket or table size. Orphans younger than the grace period are
+skipped, since an upload may still be waiting for its row to commit.
+
+Usage:
+    python -m app.utils.reconcile
+    python -m app.utils.reconcile --prefix staging/ --grace-hours 48 --delete
+"""
+import argparse
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from sqlmodel import Session, select
+
+from app.db.db import engine
+from app.models.item import Item
+from app.models.pending_delete import PendingDelete
+from app.utils.s3_service import FOLDER, iter_s3_objects
+
+RECONCILE_BATCH_SIZE = 1000
+
+
+@dataclass
+class ReconcileStats:
+    objects_scanned: int = 0
+    db_keys_scanned: int = 0
+    matched: int = 0
+    orphans: int = 0
+    orphan_bytes: int = 0
+    within_grace: int = 0
+    missing_objects: int = 0  # rows whose object is not (yet) in the bucket
+    queued_for_delete: int = 0
+    elapsed: float = 0.0
+
+    def report(self):
+        rate = self.objects_scanned / self.elapsed if self.elapsed else 0
+        print(
+            f"scanned {self.objects_scanned} objects / {self.db_keys_scanned} rows in {self.elapsed:.1f}s "
+            f"({rate:.0f} objects/s); matched={self.matched} orphans={self.orphans} "
+            f"({self.orphan_bytes / 1024 / 1024:.1f} MB) within_grace={self.within_grace} "
+            f"missing_objects={self.missing_objects} queued_for_delete={self.queued_for_delete}"
+        )
+
+
+def iter_db_keys(session: Session, prefix: str, batch_size=RECONCILE_BATCH_SIZE):
+    """
+    Stream items.image in byte order (COLLATE "C" matches the S3 listing order)
+    through a server-side cursor.
+    """
+    query = (
+        select(Item.image)
+        .where(Item.image.startswith(prefix))
+        .order_by(Item.image.collate("C"))
+        .execution_options(yield_per=batch_size)
+    )
+
+    yield from session.exec(query)
+
+
+def queue_orphans(session: Session, keys: list[str]) -> int:
+    # skip keys that are already waiting in the delete queue
+    queued = set(session.exec(select(PendingDelete.key).where(PendingDelete.key.in_(keys))).all())
+    new_keys = [key for key in keys if key not in queued]
+
+    session.add_all([PendingDelete(key=key) for key in new_keys])
+    session.commit()
+
+    return len(new_keys)
+
+
+def reconcile(prefix=f"{FOLDER}/", grace=timedelta(hours=24), delete=False, batch_size=RECONCILE_BATCH_SIZE) -> ReconcileStats:
+    stats = ReconcileStats()
+    cutoff = datetime.now(timezone.utc) - grace
+    started = time.perf_counter()
+
+    with Session(engine) as read_session, Session(engine) as write_session:
+        db_keys = iter_db_keys(read_session, prefix, batch_size)
+        db_key = next(db_keys, None)
+        pending = []
+
+        for obj in iter_s3_objects(prefix, batch_size):
+            key = obj["key"]
+            stats.objects_scanned += 1
+
+            # rows behind the current object have no object in the bucket
+            while db_key is not None and db_key < key:
+                stats.db_keys_scanned += 1
+                stats.missing_objects += 1
+                db_key = next(db_keys, None)
+
+            if db_key == key:
+                stats.matched += 1
+
+                # several rows may share a key
+                while db_key == key:
+                    stats.db_keys_scanned += 1
+                    db_key = next(db_keys, None)
+
+                continue
+
+            if obj["last_modified"] > cutoff:
+                stats.within_grace += 1
+                continue
+
+            stats.orphans += 1
+            stats.orphan_bytes += obj["size"]
+            print(f"orphan {key} size={obj['size']} last_modified={obj['last_modified'].isoformat()}")
+
+            if delete:
+                pending.append(key)
+
+                if len(pending) >= batch_size:
+                    stats.queued_for_delete += queue_orphans(write_session, pending)
+                    pending = []
+
+        # rows after the last object
+        while db_key is not None:
+            stats.db_keys_scanned += 1
+            stats.missing_objects += 1
+            db_key = next(db_keys, None)
+
+        if pending:
+            stats.queued_for_delete += queue_orphans(write_session, pending)
+
+    stats.elapsed = time.perf_counter() - started
+
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--prefix", default=f"{FOLDER}/")
+    parser.add_argument("--grace-hours", type=float, default=24)
+    parser.add_argument("--delete", action="store_true", help="queue orphans on the delete queue")
+    parser.add_argument("--batch-size", type=int, default=RECONCILE_BATCH_SIZE)
+    args = parser.parse_args()
+
+    stats = reconcile(
+        prefix=args.prefix,
+        grace=timedelta(hours=args.grace_hours),
+        delete=args.delete,
+        batch_size=args.batch_size,
+    )
+    stats.report()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+from contextvars import ContextVar
+from typing import Optional
+
+# ASGI scope of the request being served; routing fills in scope["route"]
+_scope: ContextVar[Optional[dict]] = ContextVar("request_scope", default=None)
+
+
+def current_route() -> Optional[str]:
+    """
+    "GET /items/{item_id}" for the request being served, None outside requests
+    (background workers, CLI scripts).
+    """
+    scope = _scope.get()
+    if scope is None:
+        return None
+
+    route = scope.get("route")
+    return f"{scope['method']} {getattr(route, 'path', None) or scope['path']}"
+
+
+class RequestContextMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        token = _scope.set(scope)
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _scope.reset(token)
@@ -1,70 +1,207 @@
+import hmac
 import os
 import io
-from datetime import datetime, timezone
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Optional
+from urllib.parse import quote
 from PIL import Image
-import boto3
+
+from app.utils import blurhash
+from app.utils.metrics import IMAGE_ENCODE_SECONDS, storage_timer
+from app.utils.phash import dhash, to_signed
+from app.utils.storage import get_storage, sign
+from app.utils.tracing import span
 
 
-BUCKET = os.getenv("R2_BUCKET")
 FOLDER = "uploads"
-URL = f"https://{os.getenv('CLOUDFLARE_ACCOUNT_ID')}.r2.cloudflarestorage.com"
+STAGING_FOLDER = "staging"  # raw client uploads waiting for finalize
 
-s3 = boto3.client(
-    service_name="s3",
-    endpoint_url=URL,
-    aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-    aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-    region_name="auto",
-)
+# /images proxy URL validity window
+PROXY_URL_TTL_SECONDS = 24 * 60 * 60
 
 
-def compress_image(data: bytes, max_width=1400, quality=80):
-    img = Image.open(io.BytesIO(data))
-    img = img.convert("RGB")
+# Encoder presets, from cheapest to smallest output.
+# "max" is the original hard-coded setting (full decode, WebP method=6 + LANCZOS).
+# "draft" lets the JPEG decoder downscale by a power of two while decoding.
+ENCODER_PRESETS = {
+    "fast": {"quality": 75, "method": 2, "resample": Image.BILINEAR, "draft": True},
+    "balanced": {"quality": 80, "method": 4, "resample": Image.BICUBIC, "draft": True},
+    "max": {"quality": 80, "method": 6, "resample": Image.LANCZOS, "draft": False},
+}
+
+IMAGE_PRESET = os.getenv("IMAGE_PRESET", "max")
+
+# Switch to the "fast" preset while the image pool has at least this many
+# queued jobs. 0 disables the automatic switch.
+IMAGE_FAST_PRESET_QUEUE_DEPTH = int(os.getenv("IMAGE_FAST_PRESET_QUEUE_DEPTH", "0"))
+
+if IMAGE_PRESET not in ENCODER_PRESETS:
+    raise ValueError(f"Unknown IMAGE_PRESET: {IMAGE_PRESET}")
+
+
+def select_preset() -> str:
+    if IMAGE_FAST_PRESET_QUEUE_DEPTH > 0:
+        # imported here, the pool is optional for scripts using compress_image
+        from app.utils import image_pool
+
+        if image_pool.queue_depth() >= IMAGE_FAST_PRESET_QUEUE_DEPTH:
+            return "fast"
+
+    return IMAGE_PRESET
+
+
+@contextmanager
+def _storage_call(operation: str, key: Optional[str] = None):
+    with storage_timer(operation), span(f"storage.{operation}", **{"storage.key": key} if key else {}):
+        yield
+
+
+def compress_image(data: bytes, max_width=1400, quality=None, preset=None):
+    preset = preset or select_preset()
+
+    with IMAGE_ENCODE_SECONDS.time("compress", preset), span("image.compress", preset=preset, bytes=len(data)):
+        return _compress_image(data, max_width, quality, preset)
+
+
+def _compress_image(data: bytes, max_width: int, quality, preset: str):
+    settings = ENCODER_PRESETS[preset]
+    quality = quality or settings["quality"]
+
+    with span("image.decode"):
+        img = Image.open(io.BytesIO(data))
+
+        # Let the JPEG decoder downscale by a power of two while decoding,
+        # much cheaper than decoding full size and resizing everything after
+        w, h = img.size
+        if settings["draft"] and img.format == "JPEG" and w > max_width:
+            img.draft("RGB", (max_width, int(h * (max_width / w))))
+
+        img = img.convert("RGB")
 
     # Resize while keeping aspect ratio
     w, h = img.size
     if w > max_width:
         new_height = int(h * (max_width / w))
-        img = img.resize((max_width, new_height), Image.LANCZOS)
+
+        with span("image.resize"):
+            img = img.resize((max_width, new_height), settings["resample"])
+
+    # dimensions + placeholder so clients can lay out the grid before loading
+    with span("image.hash"):
+        meta = {
+            "width": img.width,
+            "height": img.height,
+            "blurhash": blurhash.encode(img),
+            "phash": to_signed(dhash(img)),
+        }
 
     # Try WebP first
     buffer = io.BytesIO()
 
     try:
-        img.save(buffer, format="WEBP", quality=quality, method=6)
+        with span("image.encode", format="webp"):
+            img.save(buffer, format="WEBP", quality=quality, method=settings["method"])
         ext = "webp"
         mime = "image/webp"
     except Exception as e:
         print("WebP failed, falling back to JPEG:", e)
 
         buffer = io.BytesIO()
-        img.save(buffer, format="JPEG", quality=80, optimize=True)
+        with span("image.encode", format="jpeg"):
+            img.save(buffer, format="JPEG", quality=80, optimize=True)
         ext = "jpg"
         mime = "image/jpeg"
 
     buffer.seek(0)
-    return buffer, ext
+    return buffer, ext, meta
+
 
+VARIANT_FORMATS = {
+    "webp": ("WEBP", "image/webp"),
+    "jpeg": ("JPEG", "image/jpeg"),
+    "png": ("PNG", "image/png"),
+}
 
-def upload_to_s3(buffer: io.BytesIO, ext: str, original_name: str):
-    base = os.path.splitext(os.path.basename(original_name))[0]
 
-    ts = int(datetime.now(timezone.utc).timestamp())
-    key = f"{FOLDER}/{base}-{ts}.{ext}"
+def render_variant(data: bytes, width: int, fmt="webp", quality=80):
+    """
+    Resize an image down to width (never up) and encode it, for the image proxy.
+    Returns (bytes, mime).
+    """
+    with IMAGE_ENCODE_SECONDS.time("variant", "balanced"), span("image.variant", width=width, format=fmt):
+        return _render_variant(data, width, fmt, quality)
 
-    s3.upload_fileobj(buffer, BUCKET, key)
+
+def _render_variant(data: bytes, width: int, fmt: str, quality: int):
+    pil_format, mime = VARIANT_FORMATS[fmt]
+
+    img = Image.open(io.BytesIO(data))
+
+    w, h = img.size
+    if img.format == "JPEG" and w > width:
+        img.draft("RGB", (width, int(h * (width / w))))
+
+    img = img.convert("RGB")
+
+    w, h = img.size
+    if w > width:
+        img = img.resize((width, max(1, int(h * (width / w)))), ENCODER_PRESETS["balanced"]["resample"])
+
+    buffer = io.BytesIO()
+
+    if pil_format == "WEBP":
+        img.save(buffer, format="WEBP", quality=quality, method=ENCODER_PRESETS["balanced"]["method"])
+    elif pil_format == "JPEG":
+        img.save(buffer, format="JPEG", quality=quality, optimize=True)
+    else:
+        img.save(buffer, format="PNG", optimize=True)
+
+    return buffer.getvalue(), mime
+
+
+def build_s3_key(ext: str):
+    # random, so two uploads in the same second can't overwrite each other
+    return f"{FOLDER}/{uuid.uuid4().hex}.{ext}"
+
+
+def upload_to_s3(buffer: io.BytesIO, ext: str):
+    key = build_s3_key(ext)
+
+    with _storage_call("put", key):
+        get_storage().put(key, buffer)
 
     return key
 
 
+def upload_file_to_s3(path: str, key: str):
+    with _storage_call("put", key):
+        get_storage().put_file(path, key)
+
+
+def generate_presigned_upload(key: str, content_type: str, max_bytes: int, expires_in=600):
+    """
+    Presigned PUT for uploading straight to storage. It pins the key and
+    content type; the size is checked at finalize.
+    """
+    with _storage_call("presigned_upload", key):
+        return get_storage().presigned_upload(key, content_type, max_bytes, expires_in)
+
+
+def head_s3_object(key: str):
+    with _storage_call("head", key):
+        return get_storage().head(key)
+
+
+def download_s3_object(key: str) -> bytes:
+    with _storage_call("get", key):
+        return get_storage().get(key)
+
+
 def generate_signed_url(key: str, expires_in=3600):
     try:
-        return s3.generate_presigned_url(
-                "get_object",
-                Params={"Bucket": BUCKET, "Key": key},
-                ExpiresIn=expires_in
-            )
+        return get_storage().signed_url(key, expires_in)
     except Exception as e:
         print(f"Error generating signed URL: {e}")
         return None
@@ -72,17 +209,56 @@ def generate_signed_url(key: str, expires_in=3600):
 
 def delete_s3_object(key: str):
     try:
-        s3.delete_object(Bucket=BUCKET, Key=key)
+        with _storage_call("delete", key):
+            get_storage().delete(key)
     except Exception as e:
         print(f"Error deleting S3 object {key}: {e}")
 
 
+def delete_s3_objects(keys: list[str]) -> dict[str, str]:
+    """
+    Delete up to 1000 keys in one call.
+    Returns {key: error message} for the keys that failed.
+    """
+    with _storage_call("delete_many"):
+        return get_storage().delete_many(keys)
+
+
+def iter_s3_objects(prefix: str, page_size=1000):
+    """
+    Stream objects under a prefix page by page, in key order.
+    """
+    return get_storage().list(prefix, page_size)
+
+
+def generate_proxy_path(key: str, visibility: str = "public"):
+    """
+    Signed path for the /images resize proxy. Clients add w and format.
+    Expiry is rounded to PROXY_URL_TTL_SECONDS windows, so the URL (and the
+    browser's cached copy) stays the same within a window, and stops working
+    one to two windows after it was handed out.
+    """
+    expires = (int(time.time()) // PROXY_URL_TTL_SECONDS + 2) * PROXY_URL_TTL_SECONDS
+    scope = "public" if visibility == "public" else "private"
+    sig = sign(f"PROXY\n{key}\n{expires}\n{scope}")
+
+    return f"/images/{quote(key)}?expires={expires}&scope={scope}&sig={sig}"
+
+
+def verify_proxy_signature(key: str, expires: int, scope: str, sig: str) -> bool:
+    if expires < time.time():
+        return False
+
+    return hmac.compare_digest(sign(f"PROXY\n{key}\n{expires}\n{scope}"), sig)
+
+
 def get_all_urls(db_items: list):
     items_response = []
     
     for item in db_items:
         data = item.model_dump()
         data["image"] = generate_signed_url(item.image)
+        data["image_proxy"] = generate_proxy_path(item.image, item.visibility)
         items_response.append(data)
 
     return items_response
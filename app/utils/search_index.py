@@ -0,0 +1,190 @@
+import threading
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import insert
+from sqlmodel import Session, select
+
+from app.models.item import Item
+from app.models.notification import Notification
+from app.models.saved_search import SavedSearch
+from app.models.user import User
+from app.utils.matching import tokenize
+from app.utils.synced_index import SyncedIndex
+
+
+@dataclass(frozen=True)
+class Subscription:
+    id: uuid.UUID
+    user_id: int
+    category: Optional[str]
+    type: Optional[str]
+    visibility: Optional[str]
+    location_tokens: frozenset[str]
+
+    def matches(self, item: Item, location_tokens: set[str]) -> bool:
+        return (
+            (self.category is None or self.category == item.category)
+            and (self.type is None or self.type == item.type)
+            and (self.visibility is None or self.visibility == item.visibility)
+            and self.location_tokens <= location_tokens
+        )
+
+
+def subscription_from(search: SavedSearch) -> Subscription:
+    return Subscription(
+        id=search.id,
+        user_id=search.user_id,
+        category=search.category,
+        type=search.type,
+        visibility=search.visibility,
+        location_tokens=frozenset(tokenize(search.location or "")),
+    )
+
+
+class SubscriptionIndex(SyncedIndex):
+    """
+    Inverted index over saved-search predicates.
+
+    Each subscription is posted under a single pivot key, its most selective
+    predicate (a location word, else category, visibility, type). A new item
+    only probes the posting lists for its own keys and verifies the handful
+    of candidates, instead of evaluating every saved search.
+    """
+
+    name = "search-index"
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+
+        self._subs: dict[uuid.UUID, Subscription] = {}
+        self._pivots: dict[uuid.UUID, tuple] = {}
+        self._postings: dict[tuple, set[uuid.UUID]] = {}
+
+    @staticmethod
+    def _pivot(sub: Subscription) -> tuple:
+        if sub.location_tokens:
+            # longest word is usually the rarest
+            return ("location", max(sorted(sub.location_tokens), key=len))
+        if sub.category:
+            return ("category", sub.category)
+        if sub.visibility:
+            return ("visibility", sub.visibility)
+        if sub.type:
+            return ("type", sub.type)
+
+        return ("all",)
+
+    def add(self, sub: Subscription):
+        with self._lock:
+            self._remove(sub.id)
+
+            pivot = self._pivot(sub)
+            self._subs[sub.id] = sub
+            self._pivots[sub.id] = pivot
+            self._postings.setdefault(pivot, set()).add(sub.id)
+
+    def remove(self, sub_id: uuid.UUID):
+        with self._lock:
+            self._remove(sub_id)
+
+    def _remove(self, sub_id: uuid.UUID):
+        if self._subs.pop(sub_id, None) is None:
+            return
+
+        pivot = self._pivots.pop(sub_id)
+        posting = self._postings[pivot]
+        posting.discard(sub_id)
+
+        if not posting:
+            del self._postings[pivot]
+
+    def match(self, item: Item) -> list[Subscription]:
+        location_tokens = set(tokenize(item.location))
+
+        keys = [
+            ("all",),
+            ("category", item.category),
+            ("visibility", item.visibility),
+            ("type", item.type),
+            *(("location", token) for token in location_tokens),
+        ]
+
+        with self._lock:
+            return [
+                self._subs[sub_id]
+                for key in keys
+                for sub_id in self._postings.get(key, ())
+                if self._subs[sub_id].matches(item, location_tokens)
+            ]
+
+    def __len__(self):
+        return len(self._subs)
+
+    def _changes_query(self, since):
+        query = select(SavedSearch).where(SavedSearch.is_active == True)
+
+        if since is not None:
+            query = query.where(SavedSearch.created_at > since)
+
+        return query
+
+    def _apply(self, search):
+        self.add(subscription_from(search))
+        return search.created_at
+
+
+search_index = SubscriptionIndex()
+
+
+def notify_saved_searches(session: Session, item: Item):
+    """
+    Notify subscribers whose saved search matches a newly posted item,
+    with one batched INSERT.
+    """
+    search_index.ensure_synced()
+
+    candidates = search_index.match(item)
+    if not candidates:
+        return
+
+    # the DB decides: search still active (may be deleted on another worker)
+    # and the subscriber is allowed to see the item
+    query = (
+        select(SavedSearch.user_id)
+        .join(User, User.id == SavedSearch.user_id)
+        .where(SavedSearch.id.in_([sub.id for sub in candidates]))
+        .where(SavedSearch.is_active == True)
+        .where(SavedSearch.user_id != item.user_id)
+        .distinct()
+    )
+
+    if item.visibility != "public":
+        query = query.where(User.hostel == item.visibility)
+
+    user_ids = session.exec(query).all()
+    if not user_ids:
+        return
+
+    now = datetime.now(timezone.utc)
+
+    session.exec(
+        insert(Notification),
+        params=[
+            {
+                "id": uuid.uuid4(),
+                "created_at": now,
+                "user_id": user_id,
+                "type": "saved_search_match",
+                "title": "New item matches your alert",
+                "message": f"A new {item.type} item '{item.title}' matches one of your saved searches.",
+                "item_id": item.id,
+                "resolution_id": None,
+                "is_read": False,
+            }
+            for user_id in user_ids
+        ],
+    )
+    session.commit()
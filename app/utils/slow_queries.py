@@ -0,0 +1,162 @@
+"""
+Slow-query log.
+
+Statements slower than SLOW_QUERY_MS are logged with the route that issued
+them. A sample of slow SELECTs is re-run under EXPLAIN (ANALYZE, BUFFERS) by
+a background thread, on its own connection inside a rolled-back transaction,
+so plans (and the sequential scans in them) are captured without touching
+the request path. Recent entries are kept for GET /admin/slow-queries.
+"""
+import hashlib
+import os
+import queue
+import random
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from sqlalchemy import event
+
+from app.utils.request_context import current_route
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+SLOW_QUERY_EXPLAIN_RATE = float(os.getenv("SLOW_QUERY_EXPLAIN_RATE", "0.2"))
+
+# the same statement is explained at most once per interval
+SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS = 600
+SLOW_QUERY_EXPLAIN_TIMEOUT_MS = 5000
+SLOW_QUERY_QUEUE_SIZE = 100
+SLOW_QUERY_HISTORY = 200
+
+SEQ_SCAN_RE = re.compile(r"Seq Scan on (\w+)")
+
+# FOR UPDATE / NO KEY UPDATE / SHARE / KEY SHARE
+LOCKING_RE = re.compile(r"\bFOR\s+(?:NO\s+KEY\s+|KEY\s+)?(?:UPDATE|SHARE)\b", re.IGNORECASE)
+
+
+def fingerprint(statement: str) -> str:
+    # statements are already parameterized, collapse whitespace and IN-list sizes
+    normalized = re.sub(r"\s+", " ", statement).strip()
+    normalized = re.sub(r"IN \((?:%\(\w+\)s(?:, )?)+\)", "IN (...)", normalized)
+    return hashlib.sha1(normalized.encode()).hexdigest()[:12]
+
+
+class SlowQueryLog:
+    def __init__(self):
+        self.entries: deque[dict] = deque(maxlen=SLOW_QUERY_HISTORY)
+        self._explained: dict[str, float] = {}
+        self._queue: queue.Queue = queue.Queue(maxsize=SLOW_QUERY_QUEUE_SIZE)
+        self._stop = threading.Event()
+        self._thread = None
+        self._engine = None
+
+    def instrument(self, engine):
+        self._engine = engine
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("slow_query_start", []).append(time.perf_counter())
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            elapsed_ms = (time.perf_counter() - conn.info["slow_query_start"].pop()) * 1000
+
+            if elapsed_ms >= SLOW_QUERY_MS and not conn.info.get("explaining"):
+                self.record(statement, parameters, elapsed_ms, executemany)
+
+        @event.listens_for(engine, "handle_error")
+        def handle_error(context):
+            starts = context.connection.info.get("slow_query_start") if context.connection is not None else None
+            if starts:
+                starts.pop()
+
+    def record(self, statement: str, parameters, elapsed_ms: float, executemany: bool):
+        route = current_route() or "background"
+        entry = {
+            "at": datetime.now(timezone.utc).isoformat(),
+            "route": route,
+            "duration_ms": round(elapsed_ms, 1),
+            "fingerprint": fingerprint(statement),
+            "statement": statement,
+            "plan": None,
+            "seq_scans": [],
+        }
+        self.entries.append(entry)
+
+        print(f"Slow query {elapsed_ms:.0f}ms [{route}] {entry['fingerprint']}: {' '.join(statement.split())[:500]}")
+
+        if self._should_explain(entry["fingerprint"], statement, executemany):
+            try:
+                self._queue.put_nowait((entry, statement, parameters))
+            except queue.Full:
+                pass
+
+    def _should_explain(self, key: str, statement: str, executemany: bool) -> bool:
+        # ANALYZE executes the statement, so reads only
+        if executemany or not statement.lstrip().upper().startswith("SELECT"):
+            return False
+
+        # re-running a locking read would take row locks and wait on live transactions
+        if LOCKING_RE.search(statement):
+            return False
+
+        if self._engine is None or self._engine.dialect.name != "postgresql":
+            return False
+
+        if random.random() >= SLOW_QUERY_EXPLAIN_RATE:
+            return False
+
+        now = time.monotonic()
+        if now - self._explained.get(key, -SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS) < SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS:
+            return False
+
+        self._explained[key] = now
+        return True
+
+    def start(self):
+        if self._thread:
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="slow-query-explain", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=10):
+        self._stop.set()
+
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                entry, statement, parameters = self._queue.get(timeout=1)
+            except queue.Empty:
+                continue
+
+            try:
+                entry["plan"] = self.explain(statement, parameters)
+                entry["seq_scans"] = sorted(set(SEQ_SCAN_RE.findall(entry["plan"])))
+
+                print(f"Plan for slow query {entry['fingerprint']} [{entry['route']}]:\n{entry['plan']}")
+            except Exception as e:
+                print(f"EXPLAIN failed for slow query {entry['fingerprint']}: {e}")
+
+    def explain(self, statement: str, parameters) -> str:
+        with self._engine.connect() as conn:
+            conn.info["explaining"] = True
+
+            try:
+                with conn.begin() as transaction:
+                    conn.exec_driver_sql(f"SET LOCAL statement_timeout = {SLOW_QUERY_EXPLAIN_TIMEOUT_MS}")
+                    rows = conn.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters).all()
+                    transaction.rollback()
+            finally:
+                conn.info.pop("explaining", None)
+
+        return "\n".join(row[0] for row in rows)
+
+
+slow_query_log = SlowQueryLog()
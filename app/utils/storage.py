@@ -0,0 +1,284 @@
+import base64
+import hashlib
+import hmac
+import mimetypes
+import os
+import shutil
+import time
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import BinaryIO, Iterator, Optional
+from urllib.parse import quote, urlencode
+
+# "s3" (Cloudflare R2 or any S3-compatible endpoint) or "local"
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "s3")
+
+# Local backend settings
+LOCAL_STORAGE_DIR = os.getenv("LOCAL_STORAGE_DIR", "/var/lib/retrievo/storage")
+LOCAL_STORAGE_URL = os.getenv("LOCAL_STORAGE_URL", "http://localhost:8000/files")
+STORAGE_SIGNING_SECRET = os.getenv("STORAGE_SIGNING_SECRET") or os.getenv("JWT_SECRET", "")
+
+
+class StorageBackend:
+    """
+    Object storage interface. Listings and head() return plain dicts:
+    {"key", "size", "content_type", "last_modified"}.
+    """
+
+    def put(self, key: str, fileobj: BinaryIO, content_type: Optional[str] = None):
+        raise NotImplementedError
+
+    def put_file(self, path: str, key: str, content_type: Optional[str] = None):
+        with open(path, "rb") as f:
+            self.put(key, f, content_type)
+
+    def get(self, key: str) -> bytes:
+        raise NotImplementedError
+
+    def head(self, key: str) -> Optional[dict]:
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def delete_many(self, keys: list[str]) -> dict[str, str]:
+        """
+        Returns {key: error message} for keys that could not be deleted.
+        """
+        failed = {}
+
+        for key in keys:
+            try:
+                self.delete(key)
+            except Exception as e:
+                failed[key] = str(e)
+
+        return failed
+
+    def signed_url(self, key: str, expires_in=3600) -> str:
+        raise NotImplementedError
+
+    def presigned_upload(self, key: str, content_type: str, max_bytes: int, expires_in=600) -> dict:
+        """
+        Returns {"url", "method", "headers"} for a PUT of the raw file straight
+        to storage. The URL pins the key and content type; S3 can't cap the size
+        of a presigned PUT, so the caller checks it after the upload.
+        """
+        raise NotImplementedError
+
+    def list(self, prefix: str, page_size=1000) -> Iterator[dict]:
+        """
+        Objects under prefix, in key (byte) order.
+        """
+        raise NotImplementedError
+
+
+class S3Storage(StorageBackend):
+    def __init__(self):
+        import boto3
+        from botocore.config import Config
+
+        self.bucket = os.getenv("R2_BUCKET")
+
+        # S3_ENDPOINT_URL lets us point at a local S3-compatible stand-in (e.g. MinIO)
+        endpoint = os.getenv("S3_ENDPOINT_URL") or f"https://{os.getenv('CLOUDFLARE_ACCOUNT_ID')}.r2.cloudflarestorage.com"
+
+        self.client = boto3.client(
+            service_name="s3",
+            endpoint_url=endpoint,
+            aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+            aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+            region_name=os.getenv("S3_REGION", "auto"),
+            config=Config(s3={"addressing_style": os.getenv("S3_ADDRESSING_STYLE", "auto")}),
+        )
+
+    def put(self, key, fileobj, content_type=None):
+        extra = {"ContentType": content_type} if content_type else None
+        self.client.upload_fileobj(fileobj, self.bucket, key, ExtraArgs=extra)
+
+    def put_file(self, path, key, content_type=None):
+        extra = {"ContentType": content_type} if content_type else None
+        self.client.upload_file(path, self.bucket, key, ExtraArgs=extra)
+
+    def get(self, key):
+        return self.client.get_object(Bucket=self.bucket, Key=key)["Body"].read()
+
+    def head(self, key):
+        from botocore.exceptions import ClientError
+
+        try:
+            head = self.client.head_object(Bucket=self.bucket, Key=key)
+        except ClientError:
+            return None
+
+        return {
+            "key": key,
+            "size": head["ContentLength"],
+            "content_type": head.get("ContentType"),
+            "last_modified": head["LastModified"],
+        }
+
+    def delete(self, key):
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+    def delete_many(self, keys):
+        # one DeleteObjects call, up to 1000 keys
+        response = self.client.delete_objects(
+            Bucket=self.bucket,
+            Delete={
+                "Objects": [{"Key": key} for key in keys],
+                "Quiet": True,  # only report failures
+            },
+        )
+
+        return {err["Key"]: err.get("Message", err.get("Code", "")) for err in response.get("Errors", [])}
+
+    def signed_url(self, key, expires_in=3600):
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": key},
+            ExpiresIn=expires_in,
+        )
+
+    def presigned_upload(self, key, content_type, max_bytes, expires_in=600):
+        # R2 has no POST Object (form uploads), only presigned PUT. The content
+        # type is part of the signature, max_bytes can't be enforced here.
+        url = self.client.generate_presigned_url(
+            "put_object",
+            Params={"Bucket": self.bucket, "Key": key, "ContentType": content_type},
+            ExpiresIn=expires_in,
+        )
+
+        return {"url": url, "method": "PUT", "headers": {"Content-Type": content_type}}
+
+    def list(self, prefix, page_size=1000):
+        paginator = self.client.get_paginator("list_objects_v2")
+
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix, PaginationConfig={"PageSize": page_size}):
+            for obj in page.get("Contents", []):
+                yield {
+                    "key": obj["Key"],
+                    "size": obj["Size"],
+                    "content_type": None,
+                    "last_modified": obj["LastModified"],
+                }
+
+
+def sign(message: str) -> str:
+    digest = hmac.new(STORAGE_SIGNING_SECRET.encode(), message.encode(), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).decode().rstrip("=")
+
+
+def verify_signature(message: str, signature: str, expires: int) -> bool:
+    if expires < time.time():
+        return False
+
+    return hmac.compare_digest(sign(message), signature)
+
+
+class LocalStorage(StorageBackend):
+    """
+    Files under LOCAL_STORAGE_DIR, served by the /files router with
+    HMAC-signed, expiring URLs. Meant for on-prem deployments and offline tests.
+    """
+
+    def __init__(self, root: str = LOCAL_STORAGE_DIR, base_url: str = LOCAL_STORAGE_URL):
+        self.root = os.path.realpath(root)
+        self.base_url = base_url.rstrip("/")
+
+        os.makedirs(self.root, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        path = os.path.realpath(os.path.join(self.root, key))
+
+        if not path.startswith(self.root + os.sep):
+            raise ValueError(f"Invalid storage key: {key}")
+
+        return path
+
+    def put(self, key, fileobj, content_type=None):
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # write then rename, readers never see partial files
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            shutil.copyfileobj(fileobj, f)
+        os.replace(tmp, path)
+
+    def get(self, key):
+        with open(self.path(key), "rb") as f:
+            return f.read()
+
+    def head(self, key):
+        try:
+            st = os.stat(self.path(key))
+        except (FileNotFoundError, ValueError):
+            return None
+
+        return self._entry(key, st)
+
+    def delete(self, key):
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def signed_url(self, key, expires_in=3600):
+        expires = int(time.time()) + expires_in
+        query = urlencode({"expires": expires, "sig": sign(f"GET\n{key}\n{expires}")})
+
+        return f"{self.base_url}/{quote(key)}?{query}"
+
+    def presigned_upload(self, key, content_type, max_bytes, expires_in=600):
+        expires = int(time.time()) + expires_in
+        query = urlencode({
+            "max_bytes": max_bytes,
+            "expires": expires,
+            "sig": sign(f"PUT\n{key}\n{content_type}\n{max_bytes}\n{expires}"),
+        })
+
+        return {
+            "url": f"{self.base_url}/{quote(key)}?{query}",
+            "method": "PUT",
+            "headers": {"Content-Type": content_type},
+        }
+
+    def list(self, prefix, page_size=1000):
+        # fine for local volumes; sorted so callers can merge against the DB
+        base = os.path.join(self.root, os.path.dirname(prefix))
+        keys = []
+
+        for dirpath, _, filenames in os.walk(base):
+            for name in filenames:
+                if name.endswith(".tmp"):
+                    continue
+
+                key = os.path.relpath(os.path.join(dirpath, name), self.root).replace(os.sep, "/")
+                if key.startswith(prefix):
+                    keys.append(key)
+
+        for key in sorted(keys):
+            try:
+                yield self._entry(key, os.stat(self.path(key)))
+            except FileNotFoundError:
+                continue
+
+    def _entry(self, key: str, st: os.stat_result) -> dict:
+        return {
+            "key": key,
+            "size": st.st_size,
+            "content_type": mimetypes.guess_type(key)[0],
+            "last_modified": datetime.fromtimestamp(st.st_mtime, timezone.utc),
+        }
+
+
+@lru_cache
+def get_storage() -> StorageBackend:
+    if STORAGE_BACKEND == "s3":
+        return S3Storage()
+
+    if STORAGE_BACKEND == "local":
+        return LocalStorage()
+
+    raise ValueError(f"Unknown STORAGE_BACKEND: {STORAGE_BACKEND}")
@@ -0,0 +1,89 @@
+import csv
+import io
+import json
+import uuid
+from datetime import datetime
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session
+
+from app.db.db import engine
+from app.models.item import Item
+from app.utils.s3_service import generate_proxy_path, generate_signed_url
+
+STREAM_BATCH_SIZE = 500
+
+# plain columns instead of ORM instances: no identity map, no per-row model
+ITEM_COLUMNS = tuple(Item.__table__.columns)
+
+
+def _default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def iter_batches(statement, batch_size=STREAM_BATCH_SIZE):
+    """
+    Run a column query through a server-side (named) cursor and yield lists
+    of row dicts, batch_size at a time. Uses its own session: the request's
+    session is closed before a streaming body is sent.
+    """
+    statement = statement.execution_options(yield_per=batch_size)
+
+    with Session(engine) as session:
+        for partition in session.execute(statement).partitions():
+            yield [dict(row._mapping) for row in partition]
+
+
+def iter_ndjson(statement, transform=None, batch_size=STREAM_BATCH_SIZE):
+    for batch in iter_batches(statement, batch_size):
+        if transform:
+            batch = [transform(data) for data in batch]
+
+        yield "".join(json.dumps(data, default=_default) + "\n" for data in batch)
+
+
+def iter_csv(statement, batch_size=STREAM_BATCH_SIZE):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow([column.name for column in statement.selected_columns])
+    yield buffer.getvalue()
+
+    for batch in iter_batches(statement, batch_size):
+        buffer.seek(0)
+        buffer.truncate()
+
+        writer.writerows(
+            [value.isoformat() if isinstance(value, datetime) else value for value in data.values()]
+            for data in batch
+        )
+        yield buffer.getvalue()
+
+
+def _with_urls(data: dict) -> dict:
+    data["image_proxy"] = generate_proxy_path(data["image"], data["visibility"])
+    data["image"] = generate_signed_url(data["image"])
+    return data
+
+
+def iter_item_rows(query, batch_size=STREAM_BATCH_SIZE):
+    """
+    NDJSON lines for an Item query, with presigned image URLs.
+    """
+    return iter_ndjson(query.with_only_columns(*ITEM_COLUMNS), _with_urls, batch_size)
+
+
+def ndjson_response(lines) -> StreamingResponse:
+    return StreamingResponse(lines, media_type="application/x-ndjson")
+
+
+def csv_response(lines, filename: str) -> StreamingResponse:
+    return StreamingResponse(
+        lines,
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -0,0 +1,89 @@
+"""
+Base for the in-memory indexes (photo hashes, lost/found matching, saved
+searches). Each pulls rows changed since a watermark from the DB, on a
+background thread, so several API processes converge on the same contents.
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlmodel import Session
+
+from app.db.db import engine
+
+# how often lookups pull rows added by other processes
+SYNC_INTERVAL_SECONDS = 30
+
+# re-read a window before the watermark, rows may commit out of timestamp order
+SYNC_OVERLAP = timedelta(minutes=5)
+
+
+class SyncedIndex:
+    """
+    Subclasses build the query for rows changed since a timestamp and apply
+    each row; watermark, locking and the background refresh live here.
+    """
+
+    name = "index"
+    yield_per = 1000
+
+    def __init__(self):
+        self._sync_lock = threading.Lock()
+        self._synced_at: Optional[float] = None
+        self._watermark: Optional[datetime] = None  # timestamp of the newest row loaded
+
+    def _changes_query(self, since: Optional[datetime]):
+        """
+        Rows changed after `since`, or everything to load on the first sync
+        (since is None).
+        """
+        raise NotImplementedError
+
+    def _apply(self, row) -> datetime:
+        """
+        Add (or drop) one row and return its timestamp.
+        """
+        raise NotImplementedError
+
+    def sync(self):
+        """
+        Load rows changed since the last sync (all rows on first call). Blocks,
+        for the startup warm-up and scripts; requests use ensure_synced.
+        """
+        with self._sync_lock:
+            self._sync()
+
+    def _sync(self):
+        since = None if self._watermark is None else self._watermark - SYNC_OVERLAP
+
+        with Session(engine) as session:
+            for row in session.exec(self._changes_query(since).execution_options(yield_per=self.yield_per)):
+                stamp = self._apply(row)
+
+                if self._watermark is None or stamp > self._watermark:
+                    self._watermark = stamp
+
+        self._synced_at = time.monotonic()
+
+    def ensure_synced(self):
+        """
+        Refresh in the background when stale. Never blocks the caller, lookups
+        use what is loaded so far; nothing is started while the warm-up or
+        another refresh holds the sync lock.
+        """
+        if self._synced_at is not None and time.monotonic() - self._synced_at <= SYNC_INTERVAL_SECONDS:
+            return
+
+        if not self._sync_lock.acquire(blocking=False):
+            return
+
+        threading.Thread(target=self._refresh, name=f"{self.name}-sync", daemon=True).start()
+
+    def _refresh(self):
+        # runs with _sync_lock already taken by ensure_synced
+        try:
+            self._sync()
+        except Exception as e:
+            print(f"{self.name} refresh failed: {e}")
+        finally:
+            self._sync_lock.release()
@@ -0,0 +1,390 @@
+"""
+Lightweight request tracing.
+
+A sampled request gets a root span; SQL statements, storage calls, image
+work and Google token verification add child spans under it. Finished
+traces are handed to a background exporter, so the request never waits on I/O:
+
+    TRACE_EXPORTER=file  NDJSON, one span per line, to TRACE_FILE
+    TRACE_EXPORTER=otlp  OTLP/HTTP JSON to OTLP_ENDPOINT (any OpenTelemetry collector)
+
+Unsampled requests cost one random() call and a ContextVar lookup per span site.
+"""
+import json
+import os
+import queue
+import random
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+
+# fraction of requests traced. An incoming W3C traceparent keeps its trace id
+# when the request is sampled here; its sampled flag only forces tracing when
+# TRACE_TRUST_UPSTREAM is set, i.e. behind a proxy that owns the header.
+# Otherwise any client could force tracing and fill TRACE_FILE.
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0"))
+TRACE_TRUST_UPSTREAM = os.getenv("TRACE_TRUST_UPSTREAM", "false").lower() == "true"
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "file")
+TRACE_FILE = os.getenv("TRACE_FILE", "/tmp/retrievo-traces.ndjson")
+OTLP_ENDPOINT = os.getenv("OTLP_ENDPOINT", "http://localhost:4318")
+TRACE_SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "retrievo-api")
+
+# a bulk loop shouldn't turn one trace into a million spans
+TRACE_MAX_SPANS = 1000
+# finished traces waiting for export; further traces are dropped
+TRACE_QUEUE_SIZE = 1000
+TRACE_STATEMENT_MAX_CHARS = 1000
+
+
+class Trace:
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        self.spans: list["Span"] = []
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def add(self, span: "Span") -> bool:
+        with self._lock:
+            if len(self.spans) >= TRACE_MAX_SPANS:
+                self.dropped += 1
+                return False
+
+            self.spans.append(span)
+            return True
+
+    def finished(self) -> list["Span"]:
+        # work handed to background jobs may still be running at export time
+        with self._lock:
+            return [s for s in self.spans if s.end_ns is not None]
+
+
+class Span:
+    __slots__ = ("trace", "span_id", "parent_id", "name", "kind", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, trace: Trace, name: str, parent_id: Optional[str], kind: str = "internal", attributes=None):
+        self.trace = trace
+        self.span_id = random.getrandbits(64).to_bytes(8, "big").hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = attributes or {}
+        self.error = None
+
+    def set(self, key: str, value):
+        self.attributes[key] = value
+
+    def record_error(self, e: BaseException):
+        self.error = f"{type(e).__name__}: {e}"
+
+    def finish(self):
+        self.end_ns = time.time_ns()
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_ns": self.start_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+_current: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def start_span(name: str, **attributes) -> Optional[Span]:
+    """
+    Child of the current span, not made current. For leaves started and
+    finished in different callbacks (SQL events). None when not tracing.
+    """
+    parent = _current.get()
+    if parent is None:
+        return None
+
+    child = Span(parent.trace, name, parent.span_id, attributes=attributes)
+    return child if parent.trace.add(child) else None
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    with span("image.encode", preset=preset): ...
+    No-op (yields None) outside a sampled request.
+    """
+    child = start_span(name, **attributes)
+
+    if child is None:
+        yield None
+        return
+
+    token = _current.set(child)
+
+    try:
+        yield child
+    except BaseException as e:
+        child.record_error(e)
+        raise
+    finally:
+        _current.reset(token)
+        child.finish()
+
+
+class FileExporter:
+    def __init__(self, path: str = TRACE_FILE):
+        self.path = path
+
+    def export(self, traces: list[Trace]):
+        with open(self.path, "a") as f:
+            for trace in traces:
+                for s in trace.finished():
+                    f.write(json.dumps(s.to_dict(), default=str) + "\n")
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+
+    return {"stringValue": str(value)}
+
+
+class OTLPExporter:
+    """
+    OTLP/HTTP with the JSON encoding, so no protobuf/grpc dependency.
+    """
+
+    KINDS = {"internal": 1, "server": 2, "client": 3}
+
+    def __init__(self, endpoint: str = OTLP_ENDPOINT):
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+
+    def _span(self, s: Span) -> dict:
+        data = {
+            "traceId": s.trace.trace_id,
+            "spanId": s.span_id,
+            "name": s.name,
+            "kind": self.KINDS.get(s.kind, 1),
+            "startTimeUnixNano": str(s.start_ns),
+            "endTimeUnixNano": str(s.end_ns),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items()],
+        }
+
+        if s.parent_id:
+            data["parentSpanId"] = s.parent_id
+
+        if s.error:
+            data["status"] = {"code": 2, "message": s.error}
+
+        return data
+
+    def export(self, traces: list[Trace]):
+        body = {
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": TRACE_SERVICE_NAME}}]},
+                "scopeSpans": [{
+                    "scope": {"name": "app.utils.tracing"},
+                    "spans": [self._span(s) for trace in traces for s in trace.finished()],
+                }],
+            }]
+        }
+
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(body).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=5):
+            pass
+
+
+class TraceExportWorker:
+    """
+    Background thread that batches finished traces to the exporter.
+    A full queue drops traces rather than slowing requests down.
+    """
+
+    def __init__(self, exporter=None):
+        self.exporter = exporter
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=TRACE_QUEUE_SIZE)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread or self.exporter is None:
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=10):
+        self._stop.set()
+
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+        self._flush()
+
+    def submit(self, trace: Trace):
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._stop.wait(1)
+            self._flush()
+
+    def _flush(self):
+        batch = []
+
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+
+        if not batch or self.exporter is None:
+            return
+
+        try:
+            self.exporter.export(batch)
+        except Exception as e:
+            print(f"Trace export failed, dropped {len(batch)} traces: {e}")
+
+
+def _exporter():
+    if TRACE_EXPORTER == "file":
+        return FileExporter()
+
+    if TRACE_EXPORTER == "otlp":
+        return OTLPExporter()
+
+    if TRACE_EXPORTER == "none":
+        return None
+
+    raise ValueError(f"Unknown TRACE_EXPORTER: {TRACE_EXPORTER}")
+
+
+trace_exporter = TraceExportWorker(_exporter())
+
+
+def _parse_traceparent(header: str) -> Optional[tuple[str, str, bool]]:
+    """
+    (trace id, parent span id, sampled flag), None if malformed.
+    """
+    # W3C: 00-<32 hex trace id>-<16 hex parent id>-<flags>
+    parts = header.split("-")
+
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16 or len(parts[3]) != 2:
+        return None
+
+    # raises ValueError on non-hex, handled by the caller
+    if not int(parts[1], 16) or not int(parts[2], 16):
+        return None
+
+    return parts[1], parts[2], bool(int(parts[3], 16) & 1)
+
+
+class TracingMiddleware:
+    """
+    Opens the root span for sampled requests and echoes the trace id back
+    in X-Trace-Id, so a slow response can be looked up in the trace store.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        parent = None
+        for name, value in scope["headers"]:
+            if name == b"traceparent":
+                try:
+                    parent = _parse_traceparent(value.decode())
+                except ValueError:
+                    parent = None
+                break
+
+        sampled = TRACE_SAMPLE_RATE > 0 and random.random() < TRACE_SAMPLE_RATE
+
+        if not sampled and not (TRACE_TRUST_UPSTREAM and parent and parent[2]):
+            return await self.app(scope, receive, send)
+
+        trace_id, parent_id = parent[:2] if parent else (random.getrandbits(128).to_bytes(16, "big").hex(), None)
+        trace = Trace(trace_id)
+        root = Span(trace, scope["method"], parent_id, kind="server", attributes={"http.target": scope["path"]})
+        trace.add(root)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                root.set("http.status_code", message["status"])
+                message["headers"] = list(message.get("headers", [])) + [(b"x-trace-id", trace_id.encode())]
+            await send(message)
+
+        token = _current.set(root)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as e:
+            root.record_error(e)
+            raise
+        finally:
+            _current.reset(token)
+            root.finish()
+
+            route = scope.get("route")
+            root.name = f"{scope['method']} {getattr(route, 'path', None) or 'unmatched'}"
+            if trace.dropped:
+                root.set("trace.dropped_spans", trace.dropped)
+
+            trace_exporter.submit(trace)
+
+
+def instrument_engine(engine):
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("trace_spans", []).append(
+            start_span("db.query", **{"db.statement": statement[:TRACE_STATEMENT_MAX_CHARS]})
+        )
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        s = conn.info["trace_spans"].pop()
+
+        if s is not None:
+            s.set("db.rows", cursor.rowcount)
+            s.finish()
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context):
+        spans = context.connection.info.get("trace_spans") if context.connection is not None else None
+
+        if spans:
+            s = spans.pop()
+            if s is not None:
+                s.record_error(context.original_exception)
+                s.finish()
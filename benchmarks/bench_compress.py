@@ -0,0 +1,138 @@
+"""
+Benchmark compress_image presets over a corpus of photos.
+
+Reports encode time, peak memory and output size per preset. Each preset runs
+in a fresh process so peak RSS is not polluted by earlier runs.
+
+Usage:
+    python -m benchmarks.bench_compress --corpus ./photos
+    python -m benchmarks.bench_compress --synthetic 10 --presets fast max
+"""
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import resource
+import statistics
+import time
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp"}
+
+
+def load_corpus(path: str) -> list[bytes]:
+    corpus = []
+
+    for name in sorted(os.listdir(path)):
+        if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS:
+            with open(os.path.join(path, name), "rb") as f:
+                corpus.append(f.read())
+
+    return corpus
+
+
+def synthetic_corpus(count: int, size=(4032, 3024)) -> list[bytes]:
+    """
+    Phone-sized JPEGs with noise + gradients, so the encoder has real work to do.
+    """
+    from PIL import Image
+
+    corpus = []
+
+    for i in range(count):
+        img = Image.effect_noise(size, 40 + i).convert("RGB")
+        img = Image.blend(img, Image.linear_gradient("L").resize(size).convert("RGB"), 0.5)
+
+        buffer = io.BytesIO()
+        img.save(buffer, format="JPEG", quality=92)
+        corpus.append(buffer.getvalue())
+
+    return corpus
+
+
+def _peak_rss_kb() -> int:
+    # ru_maxrss is KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _run_preset(preset: str, corpus: list[bytes], repeats: int, max_width: int) -> dict:
+    from app.utils.s3_service import compress_image
+
+    baseline_kb = _peak_rss_kb()
+    timings = []
+    output_bytes = []
+
+    for _ in range(repeats):
+        for data in corpus:
+            start = time.perf_counter()
+            buffer, _, _ = compress_image(data, max_width=max_width, preset=preset)
+            timings.append(time.perf_counter() - start)
+            output_bytes.append(buffer.getbuffer().nbytes)
+
+    return {
+        "preset": preset,
+        "images": len(corpus),
+        "runs": len(timings),
+        "median_ms": statistics.median(timings) * 1000,
+        "p95_ms": (statistics.quantiles(timings, n=20)[-1] if len(timings) > 1 else timings[0]) * 1000,
+        "peak_rss_delta_mb": (_peak_rss_kb() - baseline_kb) / 1024,
+        "mean_output_kb": statistics.mean(output_bytes) / 1024,
+        "input_kb": sum(len(d) for d in corpus) / len(corpus) / 1024,
+    }
+
+
+def run_benchmark(presets: list[str], corpus: list[bytes], repeats: int, max_width: int) -> list[dict]:
+    ctx = multiprocessing.get_context("spawn")
+    results = []
+
+    with ctx.Pool(processes=1, maxtasksperchild=1) as pool:
+        for preset in presets:
+            results.append(pool.apply(_run_preset, (preset, corpus, repeats, max_width)))
+
+    return results
+
+
+def print_table(results: list[dict]):
+    header = f"{'preset':<10} {'median ms':>10} {'p95 ms':>10} {'peak MB':>9} {'out KB':>9} {'in KB':>9}"
+    print(header)
+    print("-" * len(header))
+
+    for r in results:
+        print(
+            f"{r['preset']:<10} {r['median_ms']:>10.1f} {r['p95_ms']:>10.1f} "
+            f"{r['peak_rss_delta_mb']:>9.1f} {r['mean_output_kb']:>9.1f} {r['input_kb']:>9.1f}"
+        )
+
+
+def main():
+    from app.utils.s3_service import ENCODER_PRESETS
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", help="directory of sample photos")
+    parser.add_argument("--synthetic", type=int, default=0, help="generate N synthetic phone-sized photos")
+    parser.add_argument("--presets", nargs="+", default=list(ENCODER_PRESETS), choices=list(ENCODER_PRESETS))
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--max-width", type=int, default=1400)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    if args.corpus:
+        corpus = load_corpus(args.corpus)
+    elif args.synthetic:
+        corpus = synthetic_corpus(args.synthetic)
+    else:
+        parser.error("pass --corpus or --synthetic")
+
+    if not corpus:
+        parser.error("corpus is empty")
+
+    results = run_benchmark(args.presets, corpus, args.repeats, args.max_width)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_table(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""add image_status to items
+
+Revision ID: 5c1d7e2a9b41
+Revises: f06a44c13ca0
+Create Date: 2026-10-19 10:12:04.118273
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1d7e2a9b41'
+down_revision: Union[str, Sequence[str], None] = 'f06a44c13ca0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('items', sa.Column('image_status', sqlmodel.sql.sqltypes.AutoString(), nullable=False, server_default='ready'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('items', 'image_status')
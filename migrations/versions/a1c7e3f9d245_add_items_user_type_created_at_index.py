@@ -0,0 +1,33 @@
+"""add (user_id, type, created_at) index to items
+
+Revision ID: a1c7e3f9d245
+Revises: f5b3d7e9a124
+Create Date: 2026-10-19 18:05:42.917364
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a1c7e3f9d245'
+down_revision: Union[str, Sequence[str], None] = 'f5b3d7e9a124'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_items_user_id_type_created_at',
+        'items',
+        ['user_id', 'type', sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_items_user_id_type_created_at', table_name='items')
@@ -0,0 +1,34 @@
+"""add unique index on items.image for staged uploads
+
+Revision ID: a8d2f6c4e913
+Revises: f7c4e0a2b835
+Create Date: 2026-10-20 11:03:18.274650
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8d2f6c4e913'
+down_revision: Union[str, Sequence[str], None] = 'f7c4e0a2b835'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_items_image_staged',
+        'items',
+        ['image'],
+        unique=True,
+        postgresql_where=sa.text("image LIKE 'staging/%'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_items_image_staged', table_name='items')
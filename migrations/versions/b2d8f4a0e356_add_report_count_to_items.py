@@ -0,0 +1,32 @@
+"""add report_count to items
+
+Revision ID: b2d8f4a0e356
+Revises: a1c7e3f9d245
+Create Date: 2026-10-19 18:41:09.530217
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2d8f4a0e356'
+down_revision: Union[str, Sequence[str], None] = 'a1c7e3f9d245'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('items', sa.Column('report_count', sa.Integer(), nullable=False, server_default='0'))
+    op.execute(
+        "UPDATE items SET report_count = "
+        "(SELECT count(*) FROM reports WHERE reports.item_id = items.id)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('items', 'report_count')
@@ -0,0 +1,32 @@
+"""stamp items.updated_at in the database
+
+Revision ID: b3e9c5a1d724
+Revises: a8d2f6c4e913
+Create Date: 2026-10-21 09:41:07.318524
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e9c5a1d724'
+down_revision: Union[str, Sequence[str], None] = 'a8d2f6c4e913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column(
+        'items',
+        'updated_at',
+        server_default=sa.text("timezone('UTC', clock_timestamp())"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column('items', 'updated_at', server_default=None)
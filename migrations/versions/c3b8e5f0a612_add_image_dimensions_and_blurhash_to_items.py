@@ -0,0 +1,33 @@
+"""add image dimensions and blurhash to items
+
+Revision ID: c3b8e5f0a612
+Revises: a7d4c2e91f08
+Create Date: 2026-10-19 13:24:51.907311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3b8e5f0a612'
+down_revision: Union[str, Sequence[str], None] = 'a7d4c2e91f08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('items', sa.Column('image_width', sa.Integer(), nullable=True))
+    op.add_column('items', sa.Column('image_height', sa.Integer(), nullable=True))
+    op.add_column('items', sa.Column('image_blurhash', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('items', 'image_blurhash')
+    op.drop_column('items', 'image_height')
+    op.drop_column('items', 'image_width')
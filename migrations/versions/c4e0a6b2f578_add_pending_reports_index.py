@@ -0,0 +1,34 @@
+"""add partial index on pending reports
+
+Revision ID: c4e0a6b2f578
+Revises: b2d8f4a0e356
+Create Date: 2026-10-19 19:12:37.106482
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e0a6b2f578'
+down_revision: Union[str, Sequence[str], None] = 'b2d8f4a0e356'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_reports_pending_item_id',
+        'reports',
+        ['item_id'],
+        unique=False,
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_reports_pending_item_id', table_name='reports')
@@ -0,0 +1,38 @@
+"""add visibility to item_tombstones
+
+Revision ID: c7a1e4f8b236
+Revises: b3e9c5a1d724
+Create Date: 2026-10-21 10:26:52.804193
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7a1e4f8b236'
+down_revision: Union[str, Sequence[str], None] = 'b3e9c5a1d724'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('item_tombstones', sa.Column('visibility', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+
+    # hidden items are still there; deleted ones are gone, so their existing
+    # tombstones stay visible to everyone until they are pruned
+    op.execute(
+        "UPDATE item_tombstones SET visibility = items.visibility "
+        "FROM items WHERE items.id = item_tombstones.item_id"
+    )
+    op.execute("UPDATE item_tombstones SET visibility = 'public' WHERE visibility IS NULL")
+    op.alter_column('item_tombstones', 'visibility', nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('item_tombstones', 'visibility')
@@ -0,0 +1,39 @@
+"""cascade item deletes to reports and claims
+
+Revision ID: d2b8f5e3c619
+Revises: c7a1e4f8b236
+Create Date: 2026-10-21 11:48:30.126875
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2b8f5e3c619'
+down_revision: Union[str, Sequence[str], None] = 'c7a1e4f8b236'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (constraint, table, column, referred table, ondelete)
+FOREIGN_KEYS = [
+    ('reports_item_id_fkey', 'reports', 'item_id', 'items', 'CASCADE'),
+    ('resolutions_found_item_id_fkey', 'resolutions', 'found_item_id', 'items', 'CASCADE'),
+    ('notifications_resolution_id_fkey', 'notifications', 'resolution_id', 'resolutions', 'SET NULL'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, table, column, referred, ondelete in FOREIGN_KEYS:
+        op.drop_constraint(name, table, type_='foreignkey')
+        op.create_foreign_key(name, table, referred, [column], ['id'], ondelete=ondelete)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, column, referred, _ in FOREIGN_KEYS:
+        op.drop_constraint(name, table, type_='foreignkey')
+        op.create_foreign_key(name, table, referred, [column], ['id'])
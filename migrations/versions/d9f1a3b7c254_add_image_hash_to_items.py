@@ -0,0 +1,29 @@
+"""add image_hash to items
+
+Revision ID: d9f1a3b7c254
+Revises: c3b8e5f0a612
+Create Date: 2026-10-19 14:41:09.336120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9f1a3b7c254'
+down_revision: Union[str, Sequence[str], None] = 'c3b8e5f0a612'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('items', sa.Column('image_hash', sa.BigInteger(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('items', 'image_hash')
@@ -0,0 +1,28 @@
+"""add index on items.image
+
+Revision ID: e4c6a2d8f157
+Revises: d2b8f5e3c619
+Create Date: 2026-10-21 14:07:55.630418
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4c6a2d8f157'
+down_revision: Union[str, Sequence[str], None] = 'd2b8f5e3c619'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_items_image'), 'items', ['image'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_items_image'), table_name='items')
@@ -0,0 +1,33 @@
+"""add (user_id, created_at) index to notifications
+
+Revision ID: e6b3d9f1a724
+Revises: d5f1b7c3a689
+Create Date: 2026-10-19 20:41:17.308524
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6b3d9f1a724'
+down_revision: Union[str, Sequence[str], None] = 'd5f1b7c3a689'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_notifications_user_id_created_at',
+        'notifications',
+        ['user_id', sa.text('created_at DESC')],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_notifications_user_id_created_at', table_name='notifications')
@@ -0,0 +1,46 @@
+"""add updated_at to items and item_tombstones table
+
+Revision ID: f5b3d7e9a124
+Revises: e4a2f6c8d013
+Create Date: 2026-10-19 17:32:16.204558
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5b3d7e9a124'
+down_revision: Union[str, Sequence[str], None] = 'e4a2f6c8d013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('items', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.execute("UPDATE items SET updated_at = created_at")
+    op.alter_column('items', 'updated_at', nullable=False)
+    op.create_index(op.f('ix_items_updated_at'), 'items', ['updated_at'], unique=False)
+
+    op.create_table('item_tombstones',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('item_id', sa.Uuid(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), nullable=False),
+    sa.Column('reason', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_item_tombstones_item_id'), 'item_tombstones', ['item_id'], unique=False)
+    op.create_index(op.f('ix_item_tombstones_deleted_at'), 'item_tombstones', ['deleted_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_item_tombstones_deleted_at'), table_name='item_tombstones')
+    op.drop_index(op.f('ix_item_tombstones_item_id'), table_name='item_tombstones')
+    op.drop_table('item_tombstones')
+    op.drop_index(op.f('ix_items_updated_at'), table_name='items')
+    op.drop_column('items', 'updated_at')
@@ -0,0 +1,37 @@
+"""set notifications.item_id to NULL when the item is deleted
+
+Revision ID: f7c4e0a2b835
+Revises: e6b3d9f1a724
+Create Date: 2026-10-20 10:12:36.541208
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7c4e0a2b835'
+down_revision: Union[str, Sequence[str], None] = 'e6b3d9f1a724'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_constraint('notifications_item_id_fkey', 'notifications', type_='foreignkey')
+    op.create_foreign_key(
+        'notifications_item_id_fkey',
+        'notifications',
+        'items',
+        ['item_id'],
+        ['id'],
+        ondelete='SET NULL',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('notifications_item_id_fkey', 'notifications', type_='foreignkey')
+    op.create_foreign_key('notifications_item_id_fkey', 'notifications', 'items', ['item_id'], ['id'])
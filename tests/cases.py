@@ -0,0 +1,194 @@
+"""
+One request per route (more where a route has distinct query paths), with
+the most SQL statements it may issue against the seed data in conftest.
+
+A budget going up means the route does more round trips than before: fix
+the query, or raise the number in the same change and say why.
+"""
+import io
+import os
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Callable, Optional
+
+from jose import jwt
+from PIL import Image
+from sqlalchemy import update
+from sqlmodel import Session
+
+from app.db.db import engine
+from app.models import Item, Notification, Report, Resolution
+from app.utils.pagination import encode_changes_cursor
+from app.utils.s3_service import STAGING_FOLDER
+from app.utils.storage import get_storage
+
+CLAIM = "It has my name written on the ID card inside"
+
+
+@dataclass
+class RouteCase:
+    name: str
+    method: str
+    route: str  # path template, as registered
+    max_queries: int
+    # seed -> client.request() kwargs, including "url"
+    request: Callable[[SimpleNamespace], dict]
+    user: Optional[str] = None
+    status: int = 200
+
+
+def token_for(user) -> str:
+    return jwt.encode(
+        {"sub": user.public_id, "role": user.role, "exp": datetime.now(timezone.utc) + timedelta(hours=1)},
+        os.environ["JWT_SECRET"],
+        algorithm="HS256",
+    )
+
+
+def send(client, case: RouteCase, seed: SimpleNamespace):
+    kwargs = case.request(seed)
+    url = kwargs.pop("url")
+
+    headers = {}
+    if case.user:
+        headers["Authorization"] = f"Bearer {token_for(seed.users[case.user])}"
+
+    return client.request(case.method, url, headers=headers, **kwargs)
+
+
+def _jpeg() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 48), (40, 40, 40)).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+ITEM_FORM = {
+    "item_type": "found",
+    "title": "Black wallet",
+    "description": "Black leather wallet with a student ID card inside",
+    "category": "others",
+    "date": "2026-01-15T10:00:00Z",
+    "location": "Main library",
+    "visibility": "public",
+}
+
+
+def _create_request(seed):
+    return {
+        "url": "/items/create",
+        "data": ITEM_FORM,
+        "files": {"image": ("wallet.jpg", _jpeg(), "image/jpeg")},
+    }
+
+
+def _finalize_request(seed):
+    # the client's direct upload, already in the bucket
+    key = f"{STAGING_FOLDER}/alice/{uuid.uuid4().hex}.jpg"
+    get_storage().put(key, io.BytesIO(_jpeg()), "image/jpeg")
+
+    return {"url": "/items/finalize", "data": {**ITEM_FORM, "staged_key": key}}
+
+
+def _finalize_reused_request(seed):
+    request = _finalize_request(seed)
+    key = request["data"]["staged_key"]
+
+    # an earlier finalize already created an item from this upload
+    item = seed.items["alice"]["found"][3]
+    with Session(engine) as session:
+        session.exec(update(Item).where(Item.id == item.id).values(image=key))
+        session.commit()
+
+    return request
+
+
+def _delete_reported_request(seed):
+    item = seed.items["alice"]["found"][3]
+    with Session(engine) as session:
+        session.add(Report(user_id=seed.users["carol"].id, item_id=item.id, reason="spam"))
+        session.commit()
+
+    return {"url": f"/items/{item.id}"}
+
+
+def _delete_rejected_claim_request(seed):
+    item = seed.items["bob"]["found"][6]
+    with Session(engine) as session:
+        resolution = Resolution(claimant_id=seed.users["carol"].id, found_item_id=item.id, claim_description=CLAIM, status="rejected")
+        session.add(resolution)
+        session.flush()
+        session.add(Notification(user_id=seed.users["carol"].id, type="claim_rejected", title="Claim rejected", message="Your claim was rejected.", item_id=item.id, resolution_id=resolution.id))
+        session.commit()
+
+    return {"url": f"/items/{item.id}"}
+
+
+def _changes_cursor(seed, age=timedelta(hours=1)):
+    return encode_changes_cursor(datetime.now(timezone.utc).replace(tzinfo=None) - age, uuid.UUID(int=0))
+
+
+def _full_sync_page_request(seed):
+    # the feed was last touched long ago, so page 1 of a full sync ends at an
+    # item older than the tombstone retention
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    with Session(engine) as session:
+        session.exec(update(Item).values(updated_at=now - timedelta(days=90)))
+        session.commit()
+
+    cursor = encode_changes_cursor(now - timedelta(days=91), uuid.UUID(int=0), snapshot=now - timedelta(seconds=2))
+    return {"url": "/items/changes", "params": {"since": cursor}}
+
+
+CASES = [
+    # items
+    RouteCase("items.create", "POST", "/items/create", 6, _create_request, user="alice"),
+    RouteCase("items.upload_url", "POST", "/items/upload-url", 0, lambda s: {"url": "/items/upload-url", "json": {"content_type": "image/jpeg"}}, user="alice"),
+    RouteCase("items.finalize", "POST", "/items/finalize", 6, _finalize_request, user="alice"),
+    RouteCase("items.finalize.reused", "POST", "/items/finalize", 2, _finalize_reused_request, user="alice", status=409),
+    RouteCase("items.all", "GET", "/items/all", 1, lambda s: {"url": "/items/all"}),
+    RouteCase("items.all.signed_in", "GET", "/items/all", 2, lambda s: {"url": "/items/all"}, user="alice"),
+    RouteCase("items.all.stream", "GET", "/items/all", 1, lambda s: {"url": "/items/all", "params": {"stream": True}}),
+    RouteCase("items.changes", "GET", "/items/changes", 1, lambda s: {"url": "/items/changes"}),
+    RouteCase("items.changes.full_sync_page", "GET", "/items/changes", 1, _full_sync_page_request),
+    RouteCase("items.changes.since", "GET", "/items/changes", 3, lambda s: {"url": "/items/changes", "params": {"since": _changes_cursor(s)}}, user="alice"),
+    # older than the tombstone retention
+    RouteCase("items.changes.expired", "GET", "/items/changes", 0, lambda s: {"url": "/items/changes", "params": {"since": _changes_cursor(s, timedelta(days=365))}}, user="alice", status=410),
+    RouteCase("items.get", "GET", "/items/{item_id}", 2, lambda s: {"url": f"/items/{s.items['bob']['found'][1].id}"}),
+    RouteCase("items.similar", "GET", "/items/{item_id}/similar", 3, lambda s: {"url": f"/items/{s.items['alice']['found'][0].id}/similar"}, user="alice"),
+    RouteCase("items.matches", "GET", "/items/{item_id}/matches", 3, lambda s: {"url": f"/items/{s.items['alice']['lost'][1].id}/matches"}, user="alice"),
+    RouteCase("items.update", "PATCH", "/items/{item_id}", 5, lambda s: {"url": f"/items/{s.items['alice']['lost'][1].id}", "json": {"title": "Brown wallet"}}, user="alice"),
+    RouteCase("items.delete", "DELETE", "/items/{item_id}", 6, lambda s: {"url": f"/items/{s.items['alice']['found'][2].id}"}, user="alice"),
+    # match notifications point at this one
+    RouteCase("items.delete.notified", "DELETE", "/items/{item_id}", 6, lambda s: {"url": f"/items/{s.items['alice']['lost'][2].id}"}, user="alice"),
+    RouteCase("items.delete.reported", "DELETE", "/items/{item_id}", 6, _delete_reported_request, user="alice"),
+    RouteCase("items.delete.rejected_claim", "DELETE", "/items/{item_id}", 6, _delete_rejected_claim_request, user="bob"),
+    RouteCase("items.delete.pending_claim", "DELETE", "/items/{item_id}", 3, lambda s: {"url": f"/items/{s.items['bob']['found'][1].id}"}, user="bob", status=400),
+    RouteCase("items.report", "POST", "/items/{id}/report", 4, lambda s: {"url": f"/items/{s.items['alice']['found'][1].id}/report", "json": {"reason": "spam"}}, user="carol"),
+    # profile
+    RouteCase("profile.set_hostel", "POST", "/profile/set-hostel", 3, lambda s: {"url": "/profile/set-hostel", "json": {"hostel": "girls"}}, user="carol"),
+    RouteCase("profile.set_phone", "POST", "/profile/set-phone", 3, lambda s: {"url": "/profile/set-phone", "json": {"phone": "+91 98765 43211"}}, user="carol"),
+    RouteCase("profile.me", "GET", "/profile/me", 1, lambda s: {"url": "/profile/me"}, user="alice"),
+    RouteCase("profile.items", "GET", "/profile/items", 4, lambda s: {"url": "/profile/items"}, user="alice"),
+    RouteCase("profile.items.section", "GET", "/profile/items", 3, lambda s: {"url": "/profile/items", "params": {"type": "lost", "limit": 5}}, user="alice"),
+    RouteCase("profile.public", "GET", "/profile/{public_id}", 4, lambda s: {"url": "/profile/bob"}),
+    RouteCase("profile.public.signed_in", "GET", "/profile/{public_id}", 5, lambda s: {"url": "/profile/bob"}, user="alice"),
+    # notifications
+    RouteCase("notifications.all", "GET", "/notifications/all", 2, lambda s: {"url": "/notifications/all"}, user="alice"),
+    RouteCase("notifications.all.unread", "GET", "/notifications/all", 2, lambda s: {"url": "/notifications/all", "params": {"unread_only": True}}, user="alice"),
+    RouteCase("notifications.count", "GET", "/notifications/count", 2, lambda s: {"url": "/notifications/count"}, user="alice"),
+    RouteCase("notifications.mark_read", "POST", "/notifications/{id}/mark-read", 3, lambda s: {"url": f"/notifications/{s.notifications[1]}/mark-read"}, user="alice"),
+    RouteCase("notifications.mark_all_read", "POST", "/notifications/mark-all-read", 3, lambda s: {"url": "/notifications/mark-all-read"}, user="alice"),
+    # resolutions
+    RouteCase("resolutions.create", "POST", "/resolutions/create", 8, lambda s: {"url": "/resolutions/create", "json": {"found_item_id": str(s.items["bob"]["found"][5].id), "claim_description": CLAIM}}, user="alice"),
+    RouteCase("resolutions.status", "GET", "/resolutions/status/{resolution_id}", 2, lambda s: {"url": f"/resolutions/status/{s.pending_resolutions[0]}"}, user="carol"),
+    RouteCase("resolutions.status.approved", "GET", "/resolutions/status/{resolution_id}", 3, lambda s: {"url": f"/resolutions/status/{s.approved_resolution}"}, user="carol"),
+    RouteCase("resolutions.review", "GET", "/resolutions/review/{item_id}", 2, lambda s: {"url": f"/resolutions/review/{s.items['bob']['found'][1].id}"}, user="bob"),
+    RouteCase("resolutions.approve", "POST", "/resolutions/{resolution_id}/approve", 7, lambda s: {"url": f"/resolutions/{s.pending_resolutions[0]}/approve"}, user="bob"),
+    RouteCase("resolutions.reject", "POST", "/resolutions/{resolution_id}/reject", 7, lambda s: {"url": f"/resolutions/{s.pending_resolutions[1]}/reject", "json": {"rejection_reason": "The ID card inside has another name"}}, user="bob"),
+    # auth
+    RouteCase("auth.google.new_user", "POST", "/auth/google", 3, lambda s: {"url": "/auth/google", "json": {"id_token": "dave"}}),
+    RouteCase("auth.google.existing_user", "POST", "/auth/google", 1, lambda s: {"url": "/auth/google", "json": {"id_token": "alice"}}),
+    RouteCase("auth.refresh", "POST", "/auth/refresh", 1, lambda s: {"url": "/auth/refresh", "json": {"token": token_for(s.users["alice"])}}),
+]
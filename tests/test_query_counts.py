@@ -0,0 +1,142 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import update
+from sqlmodel import Session, func, select
+
+from app.db.db import engine
+from app.main import app
+from app.models import Item, Notification
+from app.models.item_tombstone import ItemTombstone
+from app.routers import items
+from tests.cases import CASES, ITEM_FORM, _changes_cursor, _jpeg, send, token_for
+
+ROUTER_PREFIXES = ("/items", "/profile", "/notifications", "/resolutions", "/auth")
+
+
+def _format(statements) -> str:
+    return "\n".join(f"  {i}. {' '.join(statement.split())[:300]}" for i, (statement, _, _) in enumerate(statements, 1))
+
+
+@pytest.mark.parametrize("case", CASES, ids=lambda case: case.name)
+def test_query_count(case, client, seed, record_queries):
+    with record_queries() as statements:
+        response = send(client, case, seed)
+
+    assert response.status_code == case.status, response.text
+    assert len(statements) <= case.max_queries, (
+        f"{case.method} {case.route} issued {len(statements)} SQL statements, budget is {case.max_queries}:\n"
+        + _format(statements)
+    )
+
+
+def test_changes_full_sync_walks_every_page(client, seed, record_queries, monkeypatch):
+    # small pages over a feed last updated before the tombstone retention
+    monkeypatch.setattr(items, "CHANGES_LIMIT", 10)
+
+    with Session(engine) as session:
+        session.exec(update(Item).values(updated_at=datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=90)))
+        session.commit()
+
+    headers = {"Authorization": f"Bearer {token_for(seed.users['alice'])}"}
+    seen, params, pages = [], {}, 0
+
+    while True:
+        with record_queries() as statements:
+            response = client.get("/items/changes", params=params, headers=headers)
+
+        assert response.status_code == 200, f"page {pages + 1}: {response.text}"
+        assert len(statements) <= 2, _format(statements)
+
+        body = response.json()
+        seen += [item["id"] for item in body["items"]]
+        pages += 1
+
+        if not body["has_more"]:
+            break
+
+        params = {"since": body["cursor"]}
+
+    visible = {
+        str(item.id)
+        for owner in seed.items.values()
+        for section in owner.values()
+        for item in section
+        if item.visibility in ("public", seed.users["alice"].hostel)
+    }
+
+    assert pages > 1
+    assert len(seen) == len(set(seen)) and set(seen) == visible
+
+
+def test_changes_removed_only_lists_items_the_user_could_see(client, seed):
+    alice, bob = seed.users["alice"], seed.users["bob"]
+    lost = seed.items["alice"]["lost"]
+    restricted, public, narrowed = lost[3], lost[4], lost[5]
+    assert (restricted.visibility, public.visibility, narrowed.visibility) == (alice.hostel, "public", "public")
+
+    def auth(user):
+        return {"Authorization": f"Bearer {token_for(user)}"}
+
+    for item in (restricted, public):
+        assert client.delete(f"/items/{item.id}", headers=auth(alice)).status_code == 200
+
+    response = client.patch(f"/items/{narrowed.id}", json={"visibility": alice.hostel}, headers=auth(alice))
+    assert response.status_code == 200
+
+    # move the changes past the settle window
+    settled = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(seconds=5)
+    with Session(engine) as session:
+        session.exec(update(Item).where(Item.id == narrowed.id).values(updated_at=settled))
+        session.exec(update(ItemTombstone).values(deleted_at=settled))
+        session.commit()
+
+    def removed(user):
+        response = client.get("/items/changes", params={"since": _changes_cursor(seed)}, headers=auth(user))
+        assert response.status_code == 200, response.text
+        return set(response.json()["removed"])
+
+    assert removed(bob) == {str(public.id), str(narrowed.id)}
+    assert removed(alice) == {str(restricted.id), str(public.id)}
+
+
+def test_match_notifications_respect_the_owners_hostel(client, seed):
+    alice, bob = seed.users["alice"], seed.users["bob"]
+
+    def post_found(visibility):
+        response = client.post(
+            "/items/create",
+            data={**ITEM_FORM, "visibility": visibility, "date": datetime.now(timezone.utc).isoformat()},
+            files={"image": ("wallet.jpg", _jpeg(), "image/jpeg")},
+            headers={"Authorization": f"Bearer {token_for(alice)}"},
+        )
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    def notified(item_id):
+        with Session(engine) as session:
+            return session.exec(
+                select(func.count())
+                .select_from(Notification)
+                .where(Notification.user_id == bob.id)
+                .where(Notification.type == "match_found")
+                .where(Notification.item_id == item_id)
+            ).one()
+
+    # bob's lost wallets match; he can't see an item for alice's hostel only
+    assert notified(post_found(alice.hostel)) == 0
+    assert notified(post_found("public")) > 0
+
+
+def test_every_route_has_a_case():
+    covered = {(case.method, case.route) for case in CASES}
+
+    routes = {
+        (method, route.path)
+        for route in app.routes
+        if route.path.startswith(ROUTER_PREFIXES)
+        for method in getattr(route, "methods", ())
+        if method != "HEAD"
+    }
+
+    assert routes <= covered, f"Routes without a query budget: {sorted(routes - covered)}"
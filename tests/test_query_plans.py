@@ -0,0 +1,91 @@
+"""
+Every SELECT a hot route issues must be answerable from an index.
+
+Plans are taken with enable_seqscan off, so on the small seed tables the
+planner still picks an index when a usable one exists; a Seq Scan (or an
+index walked end to end with no condition) means there is none.
+"""
+import pytest
+from sqlalchemy import text
+
+from app.db.db import engine
+from tests.cases import CASES, send
+
+pytestmark = pytest.mark.skipif(engine.dialect.name != "postgresql", reason="query plans are checked on Postgres only")
+
+# per-request paths of the feed, item page, profile, inbox and claim screens;
+# the full /items/all listing scans by design and is left out
+HOT_ROUTES = [
+    "items.get",
+    "items.similar",
+    "items.matches",
+    "items.changes.since",
+    "profile.items",
+    "profile.items.section",
+    "profile.public.signed_in",
+    "notifications.all",
+    "notifications.count",
+    "notifications.mark_all_read",
+    "resolutions.create",
+    "resolutions.status.approved",
+    "resolutions.review",
+    "auth.google.existing_user",
+    "auth.refresh",
+]
+
+CASES_BY_NAME = {case.name: case for case in CASES}
+
+INDEX_SCANS = {"Index Scan", "Index Only Scan", "Bitmap Index Scan"}
+
+
+def _full_scans(node: dict) -> list[str]:
+    scans = []
+
+    if node["Node Type"] == "Seq Scan":
+        scans.append(f"Seq Scan on {node['Relation Name']}")
+    elif node["Node Type"] in INDEX_SCANS and "Index Cond" not in node:
+        scans.append(f"{node['Node Type']} using {node['Index Name']} with no index condition")
+
+    for child in node.get("Plans", ()):
+        scans.extend(_full_scans(child))
+
+    return scans
+
+
+def _explain(statement: str, parameters) -> dict:
+    with engine.connect() as conn:
+        with conn.begin() as transaction:
+            conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+            plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+            transaction.rollback()
+
+    return plan[0]["Plan"]
+
+
+@pytest.fixture
+def analyzed(seed):
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+
+    return seed
+
+
+@pytest.mark.parametrize("name", HOT_ROUTES)
+def test_hot_queries_use_indexes(name, client, analyzed, record_queries):
+    case = CASES_BY_NAME[name]
+
+    with record_queries() as statements:
+        response = send(client, case, analyzed)
+
+    assert response.status_code == case.status, response.text
+
+    selects = [
+        (statement, parameters)
+        for statement, parameters, executemany in statements
+        if not executemany and statement.lstrip().upper().startswith("SELECT")
+    ]
+    assert selects, f"{name} issued no SELECT to check"
+
+    for statement, parameters in selects:
+        scans = _full_scans(_explain(statement, parameters))
+        assert not scans, f"{case.method} {case.route}: {', '.join(scans)} in\n{' '.join(statement.split())}"